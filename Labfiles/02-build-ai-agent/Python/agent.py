@@ -8,6 +8,7 @@ from pathlib import Path
 from azure.identity import DefaultAzureCredential
 from azure.ai.agents import AgentsClient
 from azure.ai.agents.models import FilePurpose, CodeInterpreterTool, ListSortOrder, MessageRole
+from agent_registry import AgentRegistry, registry_owner
 
 def main(): 
 
@@ -36,18 +37,19 @@ def main():
     )
     with agent_client:
 
+        # Reuse the file and agent from earlier runs when they haven't changed
+        registry = AgentRegistry(agent_client, owner=registry_owner(__file__))
+
 
         # Upload the data file and create a CodeInterpreterTool
-        file = agent_client.files.upload_and_poll(
-            file_path=file_path, purpose=FilePurpose.AGENTS
-        )
+        file = registry.get_or_upload_file(file_path, purpose=FilePurpose.AGENTS)
         print(f"Uploaded {file.filename}")
 
         code_interpreter = CodeInterpreterTool(file_ids=[file.id])
 
 
         # Define an agent that uses the CodeInterpreterTool
-        agent = agent_client.create_agent(
+        agent = registry.get_or_create_agent(
             model=model_deployment,
             name="data-agent",
             instructions="You are an AI agent that analyzes the data in the file that has been uploaded. Use Python to calculate statistical metrics as necessary.",
@@ -104,8 +106,8 @@ def main():
                 print(f"{message.role}: {last_msg.text.value}\n")
     
 
-        # Clean up
-        agent_client.delete_agent(agent.id)
+        # Clean up old agent versions; the current agent is kept for the next run
+        registry.wait()
 
 if __name__ == '__main__':      
     main()
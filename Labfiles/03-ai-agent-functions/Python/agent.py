@@ -9,6 +9,7 @@ from azure.identity import DefaultAzureCredential
 from azure.ai.agents import AgentsClient
 from azure.ai.agents.models import FunctionTool, ToolSet, ListSortOrder, MessageRole
 from user_functions import user_functions
+from agent_registry import AgentRegistry, registry_owner
 
 def main(): 
 
@@ -35,15 +36,20 @@ def main():
         toolset = ToolSet()
         toolset.add(functions)
         agent_client.enable_auto_function_calls(toolset)
-            
-        agent = agent_client.create_agent(
+
+        # Reuse the agent from an earlier run when its definition hasn't changed
+        registry = AgentRegistry(agent_client, owner=registry_owner(__file__))
+        agent = registry.get_or_create_agent(
             model=model_deployment,
             name="support-agent",
             instructions="""You are a technical support agent.
                             When a user has a technical issue, you get their email address and a description of the issue.
                             Then you use those values to submit a support ticket using the function available to you.
-                            If a file is saved, tell the user the file name.
-                            You can also check the status of a ticket if the user provides a ticket number.
+                            When a ticket is submitted, tell the user its ticket number.
+                            You can also check the status of one or more tickets if the user provides ticket numbers,
+                            and update the status of a ticket when asked.
+                            Before submitting a new ticket, search earlier tickets to see if the user already reported the problem.
+                            If the user reports several issues at once, submit them together in a single call.
                         """,
             toolset=toolset
         )
@@ -96,9 +102,8 @@ def main():
                 print(f"{message.role}: {last_msg.text.value}\n")
 
 
-        # Clean up
-        agent_client.delete_agent(agent.id)
-        print("Deleted agent")
+        # Clean up old agent versions; the current agent is kept for the next run
+        registry.wait()
 
     
 
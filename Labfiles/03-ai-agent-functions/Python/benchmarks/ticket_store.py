@@ -0,0 +1,115 @@
+""" Submit, bulk submit, status lookup and search timings for the ticket stores
+
+Run from the Python folder: python -m benchmarks.ticket_store
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from ticket_store import FileTicketStore, SqliteTicketStore
+
+def percentile(values: list[float], pct: float) -> float:
+    # Nearest-rank percentile of a non-empty list
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+# Vocabulary for generated ticket descriptions, so searches match a realistic share of tickets
+PRODUCTS = ["Teams", "Outlook", "Excel", "VPN", "printer", "laptop", "SharePoint", "OneDrive", "Wi-Fi", "monitor"]
+PROBLEMS = ["cannot open", "crashes when starting", "is very slow", "won't connect", "shows an error for",
+            "keeps asking for a password in", "lost files in", "freezes while using"]
+SEARCHES = ["Teams", "outlook password", "VPN won't connect", "printer error"]
+
+def make_description(rng: random.Random, i: int) -> str:
+    return f"User {rng.choice(PROBLEMS)} {rng.choice(PRODUCTS)} on device {i % 997}."
+
+def run_store(name: str, store, count: int, lookups: int, batch_size: int) -> None:
+    ticket_numbers = [format(i, "06x") for i in range(count)]
+    rng = random.Random(1)
+
+    start = time.perf_counter()
+    for i, ticket_number in enumerate(ticket_numbers):
+        store.add(ticket_number, f"user{i % 5000}@contoso.com", make_description(rng, i))
+    submit_time = time.perf_counter() - start
+
+    sample = random.Random(1).choices(ticket_numbers, k=lookups)
+    latencies = []
+    for ticket_number in sample:
+        start = time.perf_counter()
+        store.get(ticket_number)
+        latencies.append(time.perf_counter() - start)
+
+    batch = sample[:batch_size]
+    start = time.perf_counter()
+    statuses = store.get_statuses(batch)
+    batch_time = time.perf_counter() - start
+    assert len(statuses) == len(set(batch))
+
+    search_times = []
+    for query in SEARCHES:
+        start = time.perf_counter()
+        store.search(query, limit=10)
+        search_times.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    store.search("Teams", email="user42@contoso.com", limit=10)
+    email_search_time = time.perf_counter() - start
+
+    print(f"{name:<7} {count:>9} {count / submit_time:>10.0f} {percentile(latencies, 50) * 1e6:>8.1f} "
+          f"{percentile(latencies, 99) * 1e6:>8.1f} {batch_time * 1e3:>10.2f} "
+          f"{max(search_times) * 1e3:>11.2f} {email_search_time * 1e3:>11.2f}")
+
+def run_create(name: str, store, count: int, batch_size: int) -> None:
+    # Generated ticket numbers, one commit per ticket against one commit per batch
+    rng = random.Random(2)
+    tickets = [(f"user{i % 5000}@contoso.com", make_description(rng, i)) for i in range(count)]
+
+    start = time.perf_counter()
+    single = [store.create(email, description) for email, description in tickets]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = []
+    for offset in range(0, count, batch_size):
+        batched.extend(store.create_many(tickets[offset:offset + batch_size]))
+    batch_time = time.perf_counter() - start
+
+    assert len(set(single + batched)) == 2 * count
+    print(f"{name:<7} {count:>9} {count / single_time:>12.0f} {count / batch_time:>12.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=1_000_000, help="Tickets written to the SQLite store")
+    parser.add_argument("--file-tickets", type=int, default=20_000,
+                        help="Tickets written to the one-file-per-ticket store (0 to skip)")
+    parser.add_argument("--lookups", type=int, default=10_000, help="Random single-ticket status lookups")
+    parser.add_argument("--batch", type=int, default=1_000, help="Tickets in the bulk status lookup")
+    parser.add_argument("--creates", type=int, default=5_000,
+                        help="Tickets submitted with generated numbers, one at a time and then in batches")
+    parser.add_argument("--create-batch", type=int, default=100, help="Tickets per bulk submit")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="ticket_bench_"))
+    print(f"{'store':<7} {'tickets':>9} {'submit/s':>10} {'p50 µs':>8} {'p99 µs':>8} {'bulk ms':>10} "
+          f"{'search ms':>11} {'+email ms':>11}")
+
+    store = SqliteTicketStore(str(workdir / "tickets.db"))
+    run_store("sqlite", store, args.tickets, args.lookups, args.batch)
+    store.close()
+
+    if args.file_tickets:
+        files_dir = workdir / "files"
+        files_dir.mkdir()
+        run_store("files", FileTicketStore(files_dir), args.file_tickets, args.lookups, args.batch)
+
+    print(f"\n{'store':<7} {'tickets':>9} {'single/s':>12} {'bulk/s':>12}")
+    store = SqliteTicketStore(str(workdir / "tickets.db"))
+    run_create("sqlite", store, args.creates, args.create_batch)
+    store.close()
+    if args.file_tickets:
+        run_create("files", FileTicketStore(files_dir), min(args.creates, args.file_tickets), args.create_batch)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+import os
+import re
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+script_dir = Path(__file__).parent  # Get the directory of the script
+
+# Which store user_functions uses: "sqlite" (default) or "files" for one ticket-<id>.txt per ticket
+TICKET_STORE = os.getenv("TICKET_STORE", "sqlite")
+TICKET_DB = os.getenv("TICKET_DB", str(script_dir / "tickets.db"))
+
+# SQLite limits the number of bound parameters per statement
+_IN_CHUNK = 500
+
+# Words that say nothing about the problem, left out of search queries so they don't match every ticket
+_STOPWORDS = {
+    "a", "about", "already", "am", "an", "and", "any", "are", "as", "at", "be", "before", "but", "by", "can",
+    "could", "did", "do", "does", "earlier", "for", "from", "has", "have", "how", "i", "if", "in", "is", "it",
+    "its", "me", "my", "no", "not", "of", "on", "or", "report", "reported", "so", "that", "the", "their", "there",
+    "this", "to", "was", "we", "were", "what", "when", "which", "who", "why", "will", "with", "you", "your",
+}
+
+# Ticket numbers start at six hex characters and grow by two after every few clashes
+_TICKET_NUMBER_LENGTH = 6
+_ATTEMPTS_PER_LENGTH = 3
+
+
+class TicketExistsError(Exception):
+    pass
+
+
+def new_ticket_number(attempt: int = 0) -> str:
+    length = _TICKET_NUMBER_LENGTH + 2 * (attempt // _ATTEMPTS_PER_LENGTH)
+    return secrets.token_hex(length // 2)
+
+
+# Base class for ticket stores, so the storage can change without touching the agent functions
+class TicketStore(ABC):
+
+    @abstractmethod
+    def add(self, ticket_number: str, email_address: str, description: str, status: str = "Submitted") -> None:
+        # Raises TicketExistsError rather than overwrite an existing ticket
+        ...
+
+    def create(self, email_address: str, description: str) -> str:
+        # add() refuses a number that is already taken, so a clash just means drawing another one
+        attempt = 0
+        while True:
+            ticket_number = new_ticket_number(attempt)
+            try:
+                self.add(ticket_number, email_address, description)
+                return ticket_number
+            except TicketExistsError:
+                attempt += 1
+
+    def create_many(self, tickets: List[Tuple[str, str]]) -> List[str]:
+        return [self.create(email_address, description) for email_address, description in tickets]
+
+    @abstractmethod
+    def get(self, ticket_number: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def get_statuses(self, ticket_numbers: Iterable[str]) -> Dict[str, str]:
+        ...
+
+    @abstractmethod
+    def update_status(self, ticket_number: str, status: str) -> bool:
+        ...
+
+    @abstractmethod
+    def search(self, query: str, email: Optional[str] = None, limit: int = 10) -> List[dict]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+# One ticket-<id>.txt file per ticket, the lab's original format
+class FileTicketStore(TicketStore):
+
+    def __init__(self, directory: Path = script_dir):
+        self.directory = Path(directory)
+
+    def _path(self, ticket_number: str) -> Path:
+        return self.directory / f"ticket-{ticket_number}.txt"
+
+    def add(self, ticket_number: str, email_address: str, description: str, status: str = "Submitted") -> None:
+        try:
+            self._write(ticket_number, email_address, description, status, mode="x")
+        except FileExistsError:
+            raise TicketExistsError(ticket_number) from None
+
+    def _write(self, ticket_number: str, email_address: str, description: str, status: str, mode: str) -> None:
+        text = f"Support ticket: {ticket_number}\nStatus: {status}\nSubmitted by: {email_address}\nDescription:\n{description}"
+        with self._path(ticket_number).open(mode) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def get(self, ticket_number: str) -> Optional[dict]:
+        path = self._path(ticket_number)
+        return parse_ticket_file(path) if path.exists() else None
+
+    def get_statuses(self, ticket_numbers: Iterable[str]) -> Dict[str, str]:
+        statuses = {}
+        for ticket_number in ticket_numbers:
+            ticket = self.get(ticket_number)
+            if ticket and ticket["status"]:
+                statuses[ticket_number] = ticket["status"]
+        return statuses
+
+    def update_status(self, ticket_number: str, status: str) -> bool:
+        ticket = self.get(ticket_number)
+        if ticket is None:
+            return False
+        self._write(ticket_number, ticket["email"], ticket["description"], status, mode="w")
+        return True
+
+    def search(self, query: str, email: Optional[str] = None, limit: int = 10) -> List[dict]:
+        # Scans every ticket file, so this is only practical for small numbers of tickets
+        terms = search_terms(query)
+        if not terms:
+            return []
+        scored = []
+        for path in self.directory.glob("ticket-*.txt"):
+            ticket = parse_ticket_file(path)
+            if email and ticket["email"].lower() != email.lower():
+                continue
+            words = re.findall(r"\w+", f"{ticket['description']} {ticket['email']}".lower())
+            hits = sum(words.count(term) for term in terms)
+            if hits:
+                # More matching words first; the newest ticket breaks a tie
+                scored.append((hits, path.stat().st_mtime, ticket))
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [ticket for _, _, ticket in scored[:limit]]
+
+
+# Tickets in one indexed SQLite table, so lookups don't depend on how many tickets exist
+class SqliteTicketStore(TicketStore):
+
+    def __init__(self, path: str = TICKET_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Every committed ticket is on disk before the commit returns
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS tickets (
+                   ticket_number TEXT PRIMARY KEY,
+                   email TEXT NOT NULL,
+                   description TEXT NOT NULL,
+                   status TEXT NOT NULL,
+                   created_at REAL NOT NULL,
+                   updated_at REAL NOT NULL
+               )"""
+        )
+
+        # Full-text index over descriptions and emails, kept in step with the table by triggers
+        has_index = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'"
+        ).fetchone()
+        self._conn.executescript(
+            """CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+                   description, email, content='tickets', content_rowid='rowid'
+               );
+               CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN
+                   INSERT INTO tickets_fts (rowid, description, email) VALUES (new.rowid, new.description, new.email);
+               END;
+               CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN
+                   INSERT INTO tickets_fts (tickets_fts, rowid, description, email)
+                   VALUES ('delete', old.rowid, old.description, old.email);
+               END;
+               CREATE TRIGGER IF NOT EXISTS tickets_fts_update AFTER UPDATE OF description, email ON tickets BEGIN
+                   INSERT INTO tickets_fts (tickets_fts, rowid, description, email)
+                   VALUES ('delete', old.rowid, old.description, old.email);
+                   INSERT INTO tickets_fts (rowid, description, email) VALUES (new.rowid, new.description, new.email);
+               END;"""
+        )
+        # A database created before the index existed is indexed once
+        if not has_index:
+            self._conn.execute("INSERT INTO tickets_fts (tickets_fts) VALUES ('rebuild')")
+        self._conn.commit()
+
+    def add(self, ticket_number: str, email_address: str, description: str, status: str = "Submitted") -> None:
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO tickets VALUES (?, ?, ?, ?, ?, ?)",
+                    (ticket_number, email_address, description, status, now, now),
+                )
+        except sqlite3.IntegrityError:
+            raise TicketExistsError(ticket_number) from None
+
+    def create_many(self, tickets: List[Tuple[str, str]]) -> List[str]:
+        # One transaction and one commit for the whole batch. The write lock is taken up front,
+        # so numbers checked as unused stay unused until the commit.
+        numbers: List[str] = [""] * len(tickets)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending = list(range(len(tickets)))
+                assigned = set()
+                attempt = 0
+                while pending:
+                    candidates = {index: new_ticket_number(attempt) for index in pending}
+                    taken = self._existing_numbers(list(candidates.values()))
+                    pending = []
+                    for index, ticket_number in candidates.items():
+                        if ticket_number in taken or ticket_number in assigned:
+                            pending.append(index)
+                        else:
+                            assigned.add(ticket_number)
+                            numbers[index] = ticket_number
+                    attempt += 1
+
+                now = time.time()
+                self._conn.executemany(
+                    "INSERT INTO tickets VALUES (?, ?, ?, ?, ?, ?)",
+                    [(ticket_number, email_address, description, "Submitted", now, now)
+                     for ticket_number, (email_address, description) in zip(numbers, tickets)],
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return numbers
+
+    def _existing_numbers(self, ticket_numbers: List[str]) -> set:
+        existing = set()
+        for start in range(0, len(ticket_numbers), _IN_CHUNK):
+            chunk = ticket_numbers[start:start + _IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            existing.update(row[0] for row in self._conn.execute(
+                f"SELECT ticket_number FROM tickets WHERE ticket_number IN ({placeholders})", chunk
+            ))
+        return existing
+
+    def get(self, ticket_number: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ticket_number, email, description, status FROM tickets WHERE ticket_number = ?",
+                (ticket_number,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"ticket_number": row[0], "email": row[1], "description": row[2], "status": row[3]}
+
+    def get_statuses(self, ticket_numbers: Iterable[str]) -> Dict[str, str]:
+        numbers = list(dict.fromkeys(ticket_numbers))
+        statuses = {}
+        with self._lock:
+            for start in range(0, len(numbers), _IN_CHUNK):
+                chunk = numbers[start:start + _IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                statuses.update(self._conn.execute(
+                    f"SELECT ticket_number, status FROM tickets WHERE ticket_number IN ({placeholders})", chunk
+                ))
+        return statuses
+
+    def update_status(self, ticket_number: str, status: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE tickets SET status = ?, updated_at = ? WHERE ticket_number = ?",
+                (status, time.time(), ticket_number),
+            )
+        return cursor.rowcount > 0
+
+    def search(self, query: str, email: Optional[str] = None, limit: int = 10) -> List[dict]:
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        # Any term may match; bm25 already favors tickets that match more of them
+        match = " OR ".join(f'"{term}"' for term in terms)
+        if email:
+            # The email phrase narrows the match inside the index; the exact comparison below confirms it
+            match = f'({match}) AND email : "{email.replace(chr(34), chr(34) * 2)}"'
+
+        # Every match is ranked by bm25 (FTS5's rank, lower is better) in the query that applies the limit;
+        # the most recently added ticket breaks a tie. With an email the exact check can still drop
+        # rows after ranking, so the limit is applied only after it.
+        sql = f"""SELECT t.ticket_number, t.email, t.description, t.status, t.created_at
+                  FROM (
+                      SELECT rowid, rank FROM tickets_fts WHERE tickets_fts MATCH ?
+                      ORDER BY rank, rowid DESC LIMIT ?
+                  ) AS m
+                  JOIN tickets t ON t.rowid = m.rowid
+                  {"WHERE t.email = ? COLLATE NOCASE" if email else ""}
+                  ORDER BY m.rank, m.rowid DESC LIMIT ?"""
+        params = [match, -1 if email else limit] + ([email] if email else []) + [limit]
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"ticket_number": row[0], "email": row[1], "description": row[2], "status": row[3], "created_at": row[4]}
+            for row in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+    def import_ticket_files(self, directory: Path = script_dir) -> int:
+        # One-time import of ticket-*.txt files; tickets already in the store are left alone
+        now = time.time()
+        rows = []
+        for path in Path(directory).glob("ticket-*.txt"):
+            ticket = parse_ticket_file(path)
+            rows.append((ticket["ticket_number"], ticket["email"], ticket["description"],
+                         ticket["status"] or "Submitted", path.stat().st_mtime, now))
+
+        with self._lock, self._conn:
+            cursor = self._conn.executemany("INSERT OR IGNORE INTO tickets VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Lowercase words from a free-text query, safe to quote in an FTS5 expression.
+# Stopwords and single characters are dropped, as they would match most tickets and email addresses.
+def search_terms(query: str) -> List[str]:
+    words = re.findall(r"\w+", query.lower())
+    return list(dict.fromkeys(word for word in words if len(word) > 1 and word not in _STOPWORDS))
+
+
+# Read a ticket file written by FileTicketStore or the original submit_support_ticket
+def parse_ticket_file(path: Path) -> dict:
+    ticket = {"ticket_number": path.stem.removeprefix("ticket-"), "email": "", "description": "", "status": None}
+    header, _, description = path.read_text().partition("Description:\n")
+    for line in header.splitlines():
+        key, _, value = line.partition(":")
+        if key == "Status":
+            ticket["status"] = value.strip()
+        elif key == "Submitted by":
+            ticket["email"] = value.strip()
+    ticket["description"] = description.strip()
+    return ticket
+
+
+_store: Optional[TicketStore] = None
+_store_lock = threading.Lock()
+
+# Shared store for the agent functions, created on first use
+def get_ticket_store() -> TicketStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            if TICKET_STORE == "files":
+                _store = FileTicketStore()
+            else:
+                is_new = not Path(TICKET_DB).exists()
+                _store = SqliteTicketStore(TICKET_DB)
+                # Bring in tickets saved as files before the store existed
+                if is_new:
+                    _store.import_ticket_files()
+        return _store
+
+
+if __name__ == "__main__":
+    # python ticket_store.py show <ticket_number>
+    # python ticket_store.py import [directory]
+    if len(sys.argv) > 2 and sys.argv[1] == "show":
+        ticket = get_ticket_store().get(sys.argv[2])
+        if ticket is None:
+            print(f"Ticket {sys.argv[2]} not found.")
+            sys.exit(1)
+        print(f"Support ticket: {ticket['ticket_number']}\nStatus: {ticket['status']}\n"
+              f"Submitted by: {ticket['email']}\nDescription:\n{ticket['description']}")
+        sys.exit(0)
+    if len(sys.argv) < 2 or sys.argv[1] != "import":
+        print("Usage: python ticket_store.py show <ticket_number>\n       python ticket_store.py import [directory]")
+        sys.exit(1)
+    directory = Path(sys.argv[2]) if len(sys.argv) > 2 else script_dir
+    store = SqliteTicketStore(TICKET_DB)
+    imported = store.import_ticket_files(directory)
+    print(f"Imported {imported} tickets from {directory} into {TICKET_DB} ({store.count()} tickets in total)")
+    store.close()
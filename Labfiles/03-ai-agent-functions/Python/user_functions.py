@@ -1,46 +1,88 @@
 import json
-from pathlib import Path
-import uuid
-from typing import Any, Callable, Set
+from typing import Any, Callable, Dict, List, Optional, Set
+from ticket_store import get_ticket_store
 
 # Create a function to submit a support ticket
 def submit_support_ticket(email_address: str, description: str) -> str:
-    script_dir = Path(__file__).parent  # Get the directory of the script
-    ticket_number = str(uuid.uuid4()).replace('-', '')[:6]
-    file_name = f"ticket-{ticket_number}.txt"
-    file_path = script_dir / file_name
-    text = f"Support ticket: {ticket_number}\nStatus: Submitted\nSubmitted by: {email_address}\nDescription:\n{description}"
-    file_path.write_text(text)
-
-    message_json = json.dumps({"message": f"Support ticket {ticket_number} submitted. The ticket file is saved as {file_name}"})
+    ticket_number = get_ticket_store().create(email_address, description)
+
+    message_json = json.dumps({"message": f"Support ticket {ticket_number} submitted."})
     return message_json
 
+# Function to submit many support tickets at once, each with an email_address and a description
+def submit_support_tickets(tickets: List[Dict[str, str]]) -> str:
+    invalid = [index for index, ticket in enumerate(tickets)
+               if not ticket.get("email_address") or not ticket.get("description")]
+    if invalid:
+        return json.dumps({
+            "error": f"Tickets at positions {invalid} need both an email_address and a description."
+        })
+
+    ticket_numbers = get_ticket_store().create_many(
+        [(ticket["email_address"], ticket["description"]) for ticket in tickets]
+    )
+    return json.dumps({
+        "message": f"{len(ticket_numbers)} support tickets submitted.",
+        "ticket_numbers": ticket_numbers
+    })
+
 # Function to get the status of a support ticket
 def get_ticket_status(ticket_number: str) -> str:
-    script_dir = Path(__file__).parent
-    file_name = f"ticket-{ticket_number}.txt"
-    file_path = script_dir / file_name
-    if not file_path.exists():
+    ticket = get_ticket_store().get(ticket_number)
+    if ticket is None:
         return json.dumps({
             "error": f"Ticket {ticket_number} not found."
         })
-    with file_path.open() as f:
-        for line in f:
-            if line.startswith("Status:"):
-                status = line.split(":", 1)[1].strip()
-                return json.dumps({
-                    "ticket_number": ticket_number,
-                    "status": status
-                })
+    if not ticket["status"]:
+        return json.dumps({
+            "error": f"Status not found in ticket {ticket_number}."
+        })
     return json.dumps({
-        "error": f"Status not found in ticket {ticket_number}."
+        "ticket_number": ticket_number,
+        "status": ticket["status"]
+    })
+
+# Function to get the status of several support tickets at once
+def get_ticket_statuses(ticket_numbers: List[str]) -> str:
+    statuses = get_ticket_store().get_statuses(ticket_numbers)
+    return json.dumps({
+        "statuses": statuses,
+        "not_found": [number for number in ticket_numbers if number not in statuses]
+    })
+
+# Function to change the status of a support ticket
+def update_ticket_status(ticket_number: str, status: str) -> str:
+    if not get_ticket_store().update_status(ticket_number, status):
+        return json.dumps({
+            "error": f"Ticket {ticket_number} not found."
+        })
+    return json.dumps({
+        "ticket_number": ticket_number,
+        "status": status
+    })
+
+# Function to find earlier tickets about a problem, optionally only those from one email address
+def search_tickets(query: str, email: Optional[str] = None, limit: int = 10) -> str:
+    tickets = get_ticket_store().search(query, email=email, limit=limit)
+    return json.dumps({
+        "tickets": [
+            {
+                "ticket_number": ticket["ticket_number"],
+                "status": ticket["status"],
+                "submitted_by": ticket["email"],
+                "description": ticket["description"][:200]
+            }
+            for ticket in tickets
+        ]
     })
 
 
 # Define a set of callable functions
 user_functions: Set[Callable[..., Any]] = {
     submit_support_ticket,
-    get_ticket_status
+    submit_support_tickets,
+    get_ticket_status,
+    get_ticket_statuses,
+    update_ticket_status,
+    search_tickets
 }
-
-
@@ -9,6 +9,7 @@ from azure.identity import DefaultAzureCredential
 from azure.ai.agents import AgentsClient
 from azure.ai.agents.models import FunctionTool, ToolSet, ListSortOrder, MessageRole, FilePurpose
 from user_functions import user_functions
+from http_cache import get_http_cache
 
 def main(): 
 
@@ -50,6 +51,8 @@ def main():
             Ignore advertisements, navigation menus, and unrelated content. 
             If the subject matter is not found, respond with an appropriate message. 
             Handle errors gracefully, such as invalid URLs, network issues, or missing content.
+            When there is more than one URL, fetch them all in a single call to scrape_urls instead of one at a time.
+            Pass the subject matter as the subject argument, so the scraping functions return the passages most relevant to it.
 
             Once you have the result, save it in a Word document named 'output.docx' using the provided function.
 
@@ -110,6 +113,11 @@ def main():
                 print(f"{message.role}: {last_msg.text.value}\n")
 
 
+        # Show how often scraped pages came from the cache
+        cache = get_http_cache()
+        if cache is not None:
+            print(f"Scrape cache: {cache.snapshot()}")
+
         # Clean up
         agent_client.delete_agent(agent.id)
         print("Deleted agent")
@@ -0,0 +1,92 @@
+""" Scraped payload size as the scraper learns a site's boilerplate
+
+Serves generated pages of one site (same header, menus and footer, different stories) from a local
+server and scrapes them, printing how much text each scrape returns. By default the home page is
+scraped again and again, with new stories each time, as when an agent revisits the sites in url.txt;
+--story-pages scrapes a different story page each time instead.
+
+Run from the WebScrape folder: python -m benchmarks.boilerplate
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+WORDS = ["election", "markets", "storm", "football", "science", "health", "travel", "climate", "budget",
+         "court", "music", "space", "energy", "housing", "school", "police", "border", "trade"]
+
+def make_page(number: int) -> str:
+    rng = random.Random(number)
+    menu = "".join(f"<li><a href='/{w}'>{w.title()}</a></li>" for w in WORDS)
+    header = ("<header><div>Sign in</div><div>Subscribe for $1 a week</div><form>Search</form></header>"
+              f"<nav><ul>{menu}</ul></nav><div>Trending: {' '.join(WORDS[:6])}</div>")
+    footer = ("<footer><ul><li>Terms of Use</li><li>Privacy Policy</li><li>Cookie Settings</li>"
+              "<li>Accessibility</li><li>Contact us</li></ul>"
+              f"<p>© {2020 + number % 5} News Network. All Rights Reserved.</p></footer>")
+    headline = " ".join(rng.choice(WORDS) for _ in range(8)).capitalize()
+    body = "".join(f"<p>{' '.join(rng.choice(WORDS) for _ in range(60)).capitalize()}.</p>" for _ in range(6))
+    return (f"<html><head><title>{headline}</title></head><body>{header}"
+            f"<main><h1>{headline}</h1><p>By Staff, updated {number} minutes ago</p>{body}</main>"
+            f"{footer}</body></html>")
+
+class SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # The home page gets new stories on every request
+    home_visits = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path:
+            number = int(path.rsplit("/", 1)[-1])
+        else:
+            SiteHandler.home_visits += 1
+            number = 1000 + SiteHandler.home_visits
+        body = make_page(number).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10, help="Scrapes to make")
+    parser.add_argument("--story-pages", action="store_true", help="Scrape a different story page each time")
+    parser.add_argument("--subject", help="Subject passed to the scraper")
+    args = parser.parse_args()
+
+    # Fresh cache and boilerplate databases, set before the scraper reads its settings
+    workdir = Path(tempfile.mkdtemp(prefix="boilerplate_bench_"))
+    os.environ["SCRAPE_CACHE_DB"] = str(workdir / "scrape_cache.db")
+    os.environ["SCRAPE_BOILERPLATE_DB"] = str(workdir / "boilerplate.db")
+    # The generated pages send no caching headers, so every scrape downloads the page again
+    os.environ["SCRAPE_CACHE_MIN_TTL"] = "0"
+    from user_functions import scrape_url_info
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    site = f"http://127.0.0.1:{server.server_port}"
+
+    # Home page visits use different spellings of the same URL, which all count as one page
+    home_urls = [f"{site}/", site, f"{site}/?ref=nav", f"{site}/#top"]
+
+    print(f"{'visit':>5} {'chars':>7} {'first visit':>12}")
+    first = None
+    for number in range(1, args.pages + 1):
+        url = f"{site}/story/{number}" if args.story_pages else home_urls[number % len(home_urls)]
+        result = json.loads(scrape_url_info(url, args.subject))
+        size = len(result.get("text", ""))
+        first = first or size
+        print(f"{number:>5} {size:>7} {size / first:>11.0%}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
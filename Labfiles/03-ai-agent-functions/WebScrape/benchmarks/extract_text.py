@@ -0,0 +1,81 @@
+""" Time and peak memory of the streaming text extractor against a full BeautifulSoup parse
+
+Run from the WebScrape folder: python -m benchmarks.extract_text [saved pages...]
+Without saved pages, news-style pages of a few sizes are generated.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from text_extractor import extract_text
+
+def soup_text(html: str, max_length: int) -> str:
+    # The extraction scrape_url_info used before the streaming extractor
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript']):
+        tag.decompose()
+    text = soup.get_text(separator=' ', strip=True)
+    if len(text) > max_length:
+        text = text[:max_length] + '... [truncated]'
+    return text
+
+def make_page(size: int, seed: int = 1) -> str:
+    # Navigation, inline scripts and many article teasers, roughly like a news homepage
+    rng = random.Random(seed)
+    words = ["election", "markets", "storm", "football", "science", "health", "travel", "climate", "budget",
+             "court", "music", "space", "energy", "housing", "school", "police", "border", "trade"]
+    parts = ["<html><head><title>News</title><style>body{margin:0}</style>",
+             "<script>" + "window.ads=[];" * 2000 + "</script></head><body>",
+             "<nav><ul>" + "".join(f"<li><a href='/{w}'>{w.title()}</a></li>" for w in words) + "</ul></nav>"]
+    length = sum(len(p) for p in parts)
+    i = 0
+    while length < size:
+        headline = " ".join(rng.choice(words) for _ in range(8)).capitalize()
+        teaser = " ".join(rng.choice(words) for _ in range(40))
+        part = (f"<article class='card' data-id='{i}'><h3><a href='/story/{i}'>{headline}</a></h3>"
+                f"<p>{teaser}.</p><noscript><img src='/px/{i}.gif'></noscript>"
+                f"<script>track({i})</script></article>")
+        parts.append(part)
+        length += len(part)
+        i += 1
+    parts.append("<footer>Copyright</footer></body></html>")
+    return "".join(parts)
+
+def measure(extract, html: str, max_length: int, repeat: int = 3) -> tuple:
+    # Best of a few runs, so garbage collection left over from the other extractor doesn't count
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = extract(html, max_length)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    tracemalloc.start()
+    extract(html, max_length)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return text, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="Saved HTML pages")
+    parser.add_argument("--max-length", type=int, default=5000, help="Text budget, as in scrape_url_info")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [(Path(p).name, Path(p).read_text(errors="replace")) for p in args.pages]
+    else:
+        pages = [(f"generated {mb} MB", make_page(mb * 1024 * 1024)) for mb in (1, 3, 8)]
+
+    print(f"{'page':<24} {'KB':>7} {'soup ms':>9} {'stream ms':>10} {'soup MB':>9} {'stream MB':>10} {'same':>5}")
+    for name, html in pages:
+        soup_result, soup_time, soup_peak = measure(soup_text, html, args.max_length)
+        stream_result, stream_time, stream_peak = measure(extract_text, html, args.max_length)
+        print(f"{name[:24]:<24} {len(html) / 1024:>7.0f} {soup_time * 1e3:>9.1f} {stream_time * 1e3:>10.2f} "
+              f"{soup_peak / 2**20:>9.1f} {stream_peak / 2**20:>10.2f} {str(soup_result == stream_result):>5}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+script_dir = Path(__file__).parent  # Get the directory of the script
+
+SCRAPE_BOILERPLATE = os.getenv("SCRAPE_BOILERPLATE", "on")
+SCRAPE_BOILERPLATE_DB = os.getenv("SCRAPE_BOILERPLATE_DB", str(script_dir / "boilerplate.db"))
+# A block in a landmark region (navigation, page header or footer) is boilerplate once it has been seen on
+# this many visits to the site, counting a changed version of a page already seen as another visit
+BOILERPLATE_MIN_VISITS = int(os.getenv("SCRAPE_BOILERPLATE_MIN_VISITS", "2"))
+# Any other block is boilerplate once it has been seen on this many different pages of a site...
+BOILERPLATE_MIN_PAGES = int(os.getenv("SCRAPE_BOILERPLATE_MIN_PAGES", "3"))
+# ...and on at least this share of the site's pages fetched since it first appeared,
+# so a story teaser that shows up on a few section pages is kept
+BOILERPLATE_MIN_SHARE = float(os.getenv("SCRAPE_BOILERPLATE_MIN_SHARE", "0.5"))
+# Fingerprints and page URLs remembered per site; the least recently seen go first
+BOILERPLATE_MAX_PER_DOMAIN = int(os.getenv("SCRAPE_BOILERPLATE_MAX_PER_DOMAIN", "5000"))
+_MAX_PAGES_PER_DOMAIN = 1000
+
+_WHITESPACE = re.compile(r"\s+")
+_DIGITS = re.compile(r"\d+")
+
+
+def site_of(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def canonical_url(url: str) -> str:
+    # One key per page: no scheme, www, trailing slash, query or fragment, so
+    # https://www.cnn.com/, http://cnn.com and cnn.com/?ref=x are all "cnn.com"
+    return site_of(url) + urlsplit(url).path.rstrip("/")
+
+
+def fingerprint(block: str, landmark: bool = False) -> str:
+    # Case, spacing and numbers (dates, counters, copyright years) don't make a block different.
+    # The same text inside and outside a landmark region counts as two blocks.
+    normalized = _DIGITS.sub("0", _WHITESPACE.sub(" ", block.lower()).strip())
+    if landmark:
+        normalized = "landmark:" + normalized
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def body_fingerprint(html: str) -> str:
+    return hashlib.blake2b(html.encode("utf-8", errors="replace"), digest_size=16).hexdigest()
+
+
+# Learns, per site, which blocks of text are boilerplate, so they can be left out of scraped text.
+#
+# Every fetch of a page counts as a visit, unless the page is byte-for-byte what the last visit to the same
+# (canonical) URL saw. Blocks in landmark regions only need to repeat across visits, so the menus and footer
+# of a home page are learned from fetching that one page again later. Blocks outside landmarks need to repeat
+# across different pages of the site; repeat visits to one page never make its stories boilerplate.
+class BoilerplateStore:
+
+    def __init__(self, path: str = SCRAPE_BOILERPLATE_DB, min_visits: int = BOILERPLATE_MIN_VISITS,
+                 min_pages: int = BOILERPLATE_MIN_PAGES, min_share: float = BOILERPLATE_MIN_SHARE,
+                 max_per_domain: int = BOILERPLATE_MAX_PER_DOMAIN):
+        self.path = path
+        self.min_visits = min_visits
+        self.min_pages = min_pages
+        self.min_share = min_share
+        self.max_per_domain = max_per_domain
+        self._lock = threading.Lock()
+        self._known: Dict[str, Tuple[FrozenSet[str], FrozenSet[str], str]] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Learned fingerprints are disposable, so a database from an older layout is started again
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(blocks)")}
+        if columns and "visits" not in columns:
+            self._conn.executescript("DROP TABLE blocks; DROP TABLE pages; DROP TABLE domains;")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS domains (
+                   domain TEXT PRIMARY KEY,
+                   pages INTEGER NOT NULL
+               );
+               CREATE TABLE IF NOT EXISTS pages (
+                   domain TEXT NOT NULL,
+                   url TEXT NOT NULL,
+                   body TEXT NOT NULL,
+                   learned_at REAL NOT NULL,
+                   PRIMARY KEY (domain, url)
+               );
+               CREATE TABLE IF NOT EXISTS blocks (
+                   domain TEXT NOT NULL,
+                   fingerprint TEXT NOT NULL,
+                   landmark INTEGER NOT NULL,
+                   pages INTEGER NOT NULL,
+                   visits INTEGER NOT NULL,
+                   first_page INTEGER NOT NULL,
+                   last_seen REAL NOT NULL,
+                   PRIMARY KEY (domain, fingerprint)
+               );
+               CREATE INDEX IF NOT EXISTS blocks_last_seen ON blocks (domain, last_seen);
+               CREATE INDEX IF NOT EXISTS pages_learned_at ON pages (domain, learned_at);"""
+        )
+        self._conn.commit()
+
+    def known(self, domain: str) -> Tuple[FrozenSet[str], FrozenSet[str], str]:
+        """
+        Returns the boilerplate fingerprints of a site; the landmark fingerprints that one more visit
+        would make boilerplate; and a short version tag of the boilerplate set, which changes whenever
+        the set does, so text extracted with an older set can be told apart.
+        """
+        with self._lock:
+            if domain not in self._known:
+                row = self._conn.execute("SELECT pages FROM domains WHERE domain = ?", (domain,)).fetchone()
+                pages = row[0] if row else 0
+                # first_page numbers the site's pages from 1, so the page count since is pages - first_page + 1
+                boilerplate = frozenset(fp for (fp,) in self._conn.execute(
+                    """SELECT fingerprint FROM blocks WHERE domain = ? AND (
+                           (landmark AND visits >= ?)
+                           OR (pages >= ? AND pages >= ? * (? - first_page + 1)))""",
+                    (domain, self.min_visits, self.min_pages, self.min_share, pages),
+                ))
+                next_visit = frozenset(fp for (fp,) in self._conn.execute(
+                    "SELECT fingerprint FROM blocks WHERE domain = ? AND landmark AND visits = ?",
+                    (domain, self.min_visits - 1),
+                ))
+                version = hashlib.blake2b("".join(sorted(boilerplate)).encode(), digest_size=4).hexdigest()
+                self._known[domain] = (boilerplate, next_visit, version)
+            return self._known[domain]
+
+    def is_new_visit(self, domain: str, url: str, body: str) -> bool:
+        # body is body_fingerprint() of the page
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM pages WHERE domain = ? AND url = ?", (domain, canonical_url(url))
+            ).fetchone()
+        return row is None or row[0] != body
+
+    def learn(self, domain: str, url: str, body: str, blocks: Mapping[str, bool]) -> bool:
+        # blocks maps the fingerprints seen on the page to whether they were in a landmark region
+        if not blocks:
+            return False
+        page = canonical_url(url)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT body FROM pages WHERE domain = ? AND url = ?", (domain, page)).fetchone()
+            if row is not None and row[0] == body:
+                return False
+            new_page = row is None
+            self._conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", (domain, page, body, now))
+            if new_page:
+                self._conn.execute(
+                    """INSERT INTO domains VALUES (?, 1)
+                       ON CONFLICT (domain) DO UPDATE SET pages = pages + 1""",
+                    (domain,),
+                )
+            row = self._conn.execute("SELECT pages FROM domains WHERE domain = ?", (domain,)).fetchone()
+            page_number = row[0] if row else 0
+            self._conn.executemany(
+                """INSERT INTO blocks VALUES (?, ?, ?, ?, 1, ?, ?)
+                   ON CONFLICT (domain, fingerprint) DO UPDATE SET
+                       pages = pages + excluded.pages, visits = visits + 1, last_seen = excluded.last_seen""",
+                [(domain, fp, int(landmark), int(new_page), page_number, now) for fp, landmark in blocks.items()],
+            )
+            self._trim(domain)
+            self._known.pop(domain, None)
+        return True
+
+    def _trim(self, domain: str) -> None:
+        self._conn.execute(
+            """DELETE FROM blocks WHERE domain = ? AND fingerprint IN (
+                   SELECT fingerprint FROM blocks WHERE domain = ? ORDER BY last_seen DESC LIMIT -1 OFFSET ?
+               )""",
+            (domain, domain, self.max_per_domain),
+        )
+        self._conn.execute(
+            """DELETE FROM pages WHERE domain = ? AND url IN (
+                   SELECT url FROM pages WHERE domain = ? ORDER BY learned_at DESC LIMIT -1 OFFSET ?
+               )""",
+            (domain, domain, _MAX_PAGES_PER_DOMAIN),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[BoilerplateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_boilerplate_store() -> Optional[BoilerplateStore]:
+    # None when boilerplate removal is turned off with SCRAPE_BOILERPLATE=off
+    global _store
+    if SCRAPE_BOILERPLATE == "off":
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = BoilerplateStore()
+        return _store
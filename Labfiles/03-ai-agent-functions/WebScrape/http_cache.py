@@ -0,0 +1,232 @@
+import email.utils
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+script_dir = Path(__file__).parent  # Get the directory of the script
+
+SCRAPE_CACHE = os.getenv("SCRAPE_CACHE", "on")
+SCRAPE_CACHE_DB = os.getenv("SCRAPE_CACHE_DB", str(script_dir / "scrape_cache.db"))
+SCRAPE_CACHE_MAX_MB = float(os.getenv("SCRAPE_CACHE_MAX_MB", "100"))
+# Pages are treated as fresh for at least this long, even when the site asks for less
+SCRAPE_CACHE_MIN_TTL = float(os.getenv("SCRAPE_CACHE_MIN_TTL", "300"))
+
+# Without Cache-Control or Expires, a page stays fresh for this share of the time since it last changed
+_HEURISTIC_FRACTION = 0.1
+_HEURISTIC_MAX_TTL = 24 * 3600
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_hash: str
+    fresh_until: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+    def validators(self) -> Dict[str, str]:
+        # Request headers that let the server answer 304 Not Modified
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _cache_control(headers: Mapping[str, str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str], min_ttl: float = SCRAPE_CACHE_MIN_TTL) -> Optional[float]:
+    # Seconds a response may be reused without asking the server, or None if it must not be stored
+    directives = _cache_control(headers)
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+
+    lifetime = None
+    for name in ("s-maxage", "max-age"):
+        if (directives.get(name) or "").isdigit():
+            lifetime = float(directives[name])
+            break
+    if lifetime is None:
+        expires = _http_date(headers.get("Expires"))
+        date = _http_date(headers.get("Date")) or time.time()
+        if expires is not None:
+            lifetime = max(0.0, expires - date)
+        else:
+            last_modified = _http_date(headers.get("Last-Modified"))
+            if last_modified is not None:
+                lifetime = min(_HEURISTIC_MAX_TTL, max(0.0, date - last_modified) * _HEURISTIC_FRACTION)
+            else:
+                lifetime = 0.0
+    return max(lifetime, min_ttl)
+
+
+# Response validators per URL and extracted text per response body, in one SQLite file.
+# Extracts are keyed by a hash of the body, so an unchanged page is never parsed twice,
+# even when it comes back without validators or under another URL.
+class HttpCache:
+
+    def __init__(self, path: str = SCRAPE_CACHE_DB, max_bytes: int = int(SCRAPE_CACHE_MAX_MB * 1024 * 1024),
+                 min_ttl: float = SCRAPE_CACHE_MIN_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.min_ttl = min_ttl
+        self.stats = {"fresh": 0, "revalidated": 0, "unchanged": 0, "miss": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   url TEXT PRIMARY KEY,
+                   etag TEXT,
+                   last_modified TEXT,
+                   body_hash TEXT NOT NULL,
+                   fresh_until REAL NOT NULL
+               );
+               CREATE TABLE IF NOT EXISTS extracts (
+                   body_hash TEXT NOT NULL,
+                   kind TEXT NOT NULL,
+                   value TEXT NOT NULL,
+                   size INTEGER NOT NULL,
+                   last_used REAL NOT NULL,
+                   PRIMARY KEY (body_hash, kind)
+               );
+               CREATE INDEX IF NOT EXISTS extracts_last_used ON extracts (last_used);
+               CREATE INDEX IF NOT EXISTS responses_body_hash ON responses (body_hash);"""
+        )
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extracts").fetchone()[0]
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, etag, last_modified, body_hash, fresh_until FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def store_response(self, url: str, headers: Mapping[str, str], body_hash: str) -> None:
+        lifetime = freshness_lifetime(headers, self.min_ttl)
+        with self._lock, self._conn:
+            if lifetime is None:
+                self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (url, headers.get("ETag"), headers.get("Last-Modified"), body_hash, time.time() + lifetime),
+            )
+
+    def revalidated(self, url: str, headers: Mapping[str, str]) -> None:
+        # A 304 renews freshness and may carry new validators
+        lifetime = freshness_lifetime(headers, self.min_ttl)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """UPDATE responses SET fresh_until = ?, etag = COALESCE(?, etag),
+                       last_modified = COALESCE(?, last_modified)
+                   WHERE url = ?""",
+                (time.time() + (lifetime or 0.0), headers.get("ETag"), headers.get("Last-Modified"), url),
+            )
+
+    def get_extract(self, body_hash: str, kind: str) -> Optional[str]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM extracts WHERE body_hash = ? AND kind = ?", (body_hash, kind)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE extracts SET last_used = ? WHERE body_hash = ? AND kind = ?", (time.time(), body_hash, kind)
+            )
+        return row[0]
+
+    def put_extract(self, body_hash: str, kind: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        with self._lock, self._conn:
+            old = self._conn.execute(
+                "SELECT size FROM extracts WHERE body_hash = ? AND kind = ?", (body_hash, kind)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extracts VALUES (?, ?, ?, ?, ?)", (body_hash, kind, value, size, time.time())
+            )
+            self._size += size - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Least recently used extracts go first, down to 90% of the limit to avoid evicting on every write
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT body_hash, kind, size FROM extracts ORDER BY last_used").fetchall()
+        evicted = []
+        for body_hash, kind, size in rows:
+            if self._size <= target:
+                break
+            evicted.append((body_hash, kind))
+            self._size -= size
+        self._conn.executemany("DELETE FROM extracts WHERE body_hash = ? AND kind = ?", evicted)
+        # Validators are only useful while something extracted from that body is still cached
+        self._conn.execute(
+            "DELETE FROM responses WHERE body_hash NOT IN (SELECT body_hash FROM extracts)"
+        )
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            size = self._size
+        lookups = sum(stats.values())
+        # Fresh, revalidated and unchanged pages all skip the parse; only fresh ones skip the network
+        hits = lookups - stats["miss"]
+        return {
+            **stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "network_skipped_rate": round(stats["fresh"] / lookups, 3) if lookups else 0.0,
+            "size_mb": round(size / (1024 * 1024), 2),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    # None when caching is turned off with SCRAPE_CACHE=off
+    global _cache
+    if SCRAPE_CACHE == "off":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
@@ -0,0 +1,109 @@
+import math
+import re
+from collections import Counter
+from typing import List, Tuple
+
+from text_extractor import TRUNCATED_MARKER
+
+# Passages are built from whole blocks of page text, aiming for about this many characters
+PASSAGE_LENGTH = 400
+# Longer blocks are split between sentences
+_MAX_PASSAGE_LENGTH = 2 * PASSAGE_LENGTH
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+PASSAGE_SEPARATOR = " [...] "
+
+_TOKEN = re.compile(r"\w+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = {"a", "an", "and", "are", "about", "for", "from", "in", "is", "of", "on", "or", "the", "to",
+              "what", "with", "latest", "news", "information"}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _split_long(block: str) -> List[str]:
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(block):
+        if current and len(current) + 1 + len(sentence) > PASSAGE_LENGTH:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+        # A single sentence with no breaks is cut at the maximum length
+        while len(current) > _MAX_PASSAGE_LENGTH:
+            pieces.append(current[:_MAX_PASSAGE_LENGTH])
+            current = current[_MAX_PASSAGE_LENGTH:]
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_passages(blocks: List[str]) -> List[str]:
+    # Short blocks such as headlines and list items are merged with their neighbours
+    passages, current = [], ""
+    for block in blocks:
+        if len(block) > _MAX_PASSAGE_LENGTH:
+            if current:
+                passages.append(current)
+                current = ""
+            passages.extend(_split_long(block))
+            continue
+        if current and len(current) + 1 + len(block) > PASSAGE_LENGTH:
+            passages.append(current)
+            current = ""
+        current = f"{current} {block}" if current else block
+    if current:
+        passages.append(current)
+    return passages
+
+
+def bm25_scores(passages: List[str], query: str) -> List[float]:
+    terms = [t for t in dict.fromkeys(tokenize(query)) if t not in _STOPWORDS] or tokenize(query)
+    documents = [Counter(tokenize(p)) for p in passages]
+    if not terms or not documents:
+        return [0.0] * len(passages)
+    average_length = sum(sum(d.values()) for d in documents) / len(documents) or 1.0
+    idf = {}
+    for term in terms:
+        df = sum(1 for d in documents if term in d)
+        idf[term] = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+
+    scores = []
+    for counts in documents:
+        length = sum(counts.values())
+        score = 0.0
+        for term in terms:
+            tf = counts.get(term, 0)
+            if tf:
+                score += idf[term] * tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * length / average_length))
+        scores.append(score)
+    return scores
+
+
+def select_passages(blocks: List[str], subject: str, max_length: int) -> Tuple[str, bool]:
+    """
+    Returns the passages of a page that best match the subject, in page order and joined
+    by PASSAGE_SEPARATOR, keeping within max_length characters. The flag is False when no
+    passage mentions the subject; the text is then the start of the page, as without a subject.
+    """
+    passages = split_passages(blocks)
+    scores = bm25_scores(passages, subject)
+    ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: scores[i], reverse=True)
+    if not ranked:
+        text = " ".join(blocks)
+        return (text[:max_length] + TRUNCATED_MARKER if len(text) > max_length else text), False
+
+    chosen, used = [], 0
+    for i in ranked:
+        cost = len(passages[i]) + (len(PASSAGE_SEPARATOR) if chosen else 0)
+        if used + cost <= max_length:
+            chosen.append(i)
+            used += cost
+    if not chosen:
+        # Even the best passage is over budget on its own
+        return passages[ranked[0]][:max_length] + TRUNCATED_MARKER, True
+    return PASSAGE_SEPARATOR.join(passages[i] for i in sorted(chosen)), True
@@ -0,0 +1,175 @@
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Callable, List, Optional, Tuple
+
+# Elements whose content is never visible text (BeautifulSoup's get_text also leaves out template content)
+SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+
+# Elements that start a new block of text, such as a paragraph, heading or list item
+BLOCK_TAGS = {"address", "article", "aside", "blockquote", "br", "dd", "details", "div", "dl", "dt", "figcaption",
+              "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav",
+              "ol", "p", "pre", "section", "summary", "table", "td", "th", "title", "tr", "ul"}
+
+# Page-level regions that hold site chrome rather than content: navigation always, and header, footer
+# and aside when they are not inside a piece of content (an article's header holds its headline)
+LANDMARK_TAGS = {"nav", "header", "footer", "aside"}
+_SECTIONING_TAGS = {"article", "aside", "main", "nav", "section"}
+LANDMARK_ROLES = {"banner", "complementary", "contentinfo", "navigation"}
+# Elements without an end tag, which must not be counted as open
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source",
+              "track", "wbr"}
+
+# Pages are parsed in pieces this size, so parsing can stop soon after the text budget is reached
+_FEED_SIZE = 16 * 1024
+
+TRUNCATED_MARKER = '... [truncated]'
+
+# A block still open when the text budget runs out may yet be dropped by a block filter,
+# so with a filter parsing goes on this much further before stopping
+_OPEN_BLOCK_ALLOWANCE = 2000
+
+
+class _BudgetReached(Exception):
+    pass
+
+
+# Collects the visible text of a page from parser events, without building a document tree.
+# Each text node is stripped and kept only if non-empty, as BeautifulSoup's get_text(strip=True) does.
+# Each block also records whether it sits in a landmark region (see LANDMARK_TAGS).
+# An optional block filter sees the text and landmark flag of each finished block and drops the block
+# if it returns True.
+class VisibleTextParser(HTMLParser):
+
+    def __init__(self, max_length: Optional[int] = None,
+                 block_filter: Optional[Callable[[str, bool], bool]] = None):
+        super().__init__(convert_charrefs=True)
+        self.max_length = max_length
+        self.block_filter = block_filter
+        self.strings: List[str] = []
+        self.length = 0
+        self.dropped_blocks = 0
+        # Index into strings where each block of text begins, and the text length at that point
+        self.block_starts: List[int] = [0]
+        self.block_landmarks: List[bool] = [False]
+        self._block_start_length = 0
+        # Open elements by tag, and the landmark elements enclosing the current position with their nesting level
+        self._open: Counter = Counter()
+        self._landmarks: List[Tuple[str, int]] = []
+        self._skip_depth = 0
+        # A text node can arrive in several pieces when it spans two fed chunks
+        self._pending: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._new_block()
+        if tag in _VOID_TAGS:
+            return
+        is_landmark = (tag == "nav" or dict(attrs).get("role") in LANDMARK_ROLES
+                       or (tag in LANDMARK_TAGS and not any(self._open[t] for t in _SECTIONING_TAGS)))
+        self._open[tag] += 1
+        if is_landmark:
+            self._landmarks.append((tag, self._open[tag]))
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+        if tag in BLOCK_TAGS:
+            self._new_block()
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self._new_block()
+        if self._open[tag]:
+            if self._landmarks and self._landmarks[-1] == (tag, self._open[tag]):
+                self._landmarks.pop()
+            self._open[tag] -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._pending.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def close(self):
+        super().close()
+        self._flush()
+        self._new_block()
+
+    def blocks(self) -> List[Tuple[str, bool]]:
+        # The text of each block, joined by single spaces, and whether it is in a landmark region
+        ends = self.block_starts[1:] + [len(self.strings)]
+        return [(" ".join(self.strings[start:end]), landmark)
+                for start, end, landmark in zip(self.block_starts, ends, self.block_landmarks) if end > start]
+
+    def _new_block(self):
+        start = self.block_starts[-1]
+        if start == len(self.strings):
+            return
+        if self.block_filter is not None and self.block_filter(" ".join(self.strings[start:]),
+                                                               self.block_landmarks[-1]):
+            del self.strings[start:]
+            self.length = self._block_start_length
+            self.dropped_blocks += 1
+            return
+        self.block_starts.append(len(self.strings))
+        self.block_landmarks.append(False)
+        self._block_start_length = self.length
+        if self.max_length is not None and self.length > self.max_length:
+            raise _BudgetReached()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        text = "".join(self._pending).strip()
+        self._pending.clear()
+        if text:
+            # A block belongs to the region its first text is in
+            if self.block_starts[-1] == len(self.strings):
+                self.block_landmarks[-1] = bool(self._landmarks)
+            self.strings.append(text)
+            # Separators count towards the budget, as they will in the joined text
+            self.length += len(text) + (1 if len(self.strings) > 1 else 0)
+            if self.max_length is not None and self.length > self.max_length + (
+                    _OPEN_BLOCK_ALLOWANCE if self.block_filter is not None else 0):
+                raise _BudgetReached()
+
+
+def _parse(html: str, max_length: Optional[int], block_filter: Optional[Callable[[str, bool], bool]] = None
+           ) -> VisibleTextParser:
+    parser = VisibleTextParser(max_length, block_filter)
+    try:
+        for start in range(0, len(html), _FEED_SIZE):
+            parser.feed(html[start:start + _FEED_SIZE])
+        parser.close()
+    except _BudgetReached:
+        pass
+    return parser
+
+
+def extract_text(html: str, max_length: Optional[int] = None,
+                 block_filter: Optional[Callable[[str, bool], bool]] = None) -> str:
+    # Visible text joined by single spaces. With max_length, parsing stops as soon as the text
+    # is longer than that, and the result is cut to max_length and marked as truncated.
+    parser = _parse(html, max_length, block_filter)
+    text = " ".join(parser.strings)
+    if max_length is not None and len(text) > max_length:
+        text = text[:max_length] + TRUNCATED_MARKER
+    return text
+
+
+def extract_blocks(html: str, max_length: Optional[int] = None) -> List[Tuple[str, bool]]:
+    # Visible text split into blocks at paragraphs, headings, list items and other block elements,
+    # each with whether it is in a landmark region
+    return _parse(html, max_length).blocks()
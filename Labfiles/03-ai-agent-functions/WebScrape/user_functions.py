@@ -1,38 +1,230 @@
+import hashlib
 import json
-from typing import Any, Callable, Set
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
 # For web scraping
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from boilerplate import body_fingerprint, fingerprint, get_boilerplate_store, site_of
+from http_cache import get_http_cache
+from passage_ranker import select_passages
+from text_extractor import extract_blocks, extract_text
+
+# Limits for concurrent scraping
+MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", "64"))
+MAX_PER_HOST = int(os.getenv("SCRAPE_MAX_PER_HOST", "4"))
+REQUEST_TIMEOUT = float(os.getenv("SCRAPE_REQUEST_TIMEOUT", "10"))
+BATCH_TIMEOUT = float(os.getenv("SCRAPE_BATCH_TIMEOUT", "20"))
+MAX_RESPONSE_BYTES = int(os.getenv("SCRAPE_MAX_RESPONSE_BYTES", str(5 * 1024 * 1024)))
+MAX_TEXT_LENGTH = 5000
+# Text read from a page when ranking its passages against a subject
+MAX_PAGE_TEXT = int(os.getenv("SCRAPE_MAX_PAGE_TEXT", "500000"))
+
+# One session for all requests, so connections to a host are kept alive and reused
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_PER_HOST))
+_session.mount("http://", HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_PER_HOST))
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+
+def _normalize_url(url: str) -> str:
+    # url.txt lists bare domains such as cnn.com
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    return url
+
+
+def _host_slot(host: str) -> threading.BoundedSemaphore:
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return _host_slots[host]
+
+
+@dataclass
+class _Page:
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+    encoding: str
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding, errors="replace")
+
+
+def _fetch(url: str, deadline: float, headers: Optional[Dict[str, str]] = None) -> _Page:
+    """
+    Downloads a page over the shared session, waiting for a free slot for its host.
+    Raises TimeoutError if the page is not complete by the deadline.
+    """
+    slot = _host_slot(urlsplit(url).hostname or "")
+    if not slot.acquire(timeout=max(0.0, deadline - time.monotonic())):
+        raise TimeoutError("timed out waiting for a connection to the host")
+    try:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("timed out before the request was sent")
+        with _session.get(url, headers=headers, timeout=min(REQUEST_TIMEOUT, remaining), stream=True) as response:
+            response.raise_for_status()
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                body.extend(chunk)
+                if len(body) >= MAX_RESPONSE_BYTES:
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError("timed out while downloading the page")
+            return _Page(response.status_code, response.headers, bytes(body), response.encoding or "utf-8")
+    finally:
+        slot.release()
+
+
+def _cached_extract(url: str, deadline: float, kind: str,
+                    extract: Callable[[str], str]) -> Tuple[str, Optional[str]]:
+    """
+    Returns what extract() makes of the page at url, and how the cache served it:
+    "fresh" (no request), "revalidated" (304 Not Modified), "unchanged" (same body as
+    an earlier download, so no parse), "miss", or None when caching is off.
+    """
+    cache = get_http_cache()
+    if cache is None:
+        return extract(_fetch(url, deadline).text), None
+
+    entry = cache.lookup(url)
+    cached = cache.get_extract(entry.body_hash, kind) if entry else None
+    if cached is not None and entry.is_fresh:
+        cache.record("fresh")
+        return cached, "fresh"
+
+    # Only ask for a 304 when there is something cached to fall back on
+    page = _fetch(url, deadline, entry.validators() if cached is not None else None)
+    if page.status == 304 and cached is not None:
+        cache.revalidated(url, page.headers)
+        cache.record("revalidated")
+        return cached, "revalidated"
+
+    body_hash = hashlib.sha256(page.body).hexdigest()
+    value = cache.get_extract(body_hash, kind)
+    outcome = "unchanged" if value is not None else "miss"
+    if value is None:
+        value = extract(page.text)
+        cache.put_extract(body_hash, kind, value)
+    cache.store_response(url, page.headers, body_hash)
+    cache.record(outcome)
+    return value, outcome
+
+
+def _scrape(url: str, deadline: float, subject: Optional[str] = None) -> Dict[str, Any]:
+    try:
+        page_url = _normalize_url(url)
+        # Blocks the site repeats (menus, headers, footers) are left out, and each newly
+        # fetched page teaches the store more about what the site repeats
+        store = get_boilerplate_store()
+        domain = site_of(page_url)
+        boilerplate, next_visit, version = store.known(domain) if store else (frozenset(), frozenset(), "")
+        seen: Dict[str, bool] = {}
+        visit = {'body': None, 'new': False}
+
+        def start_visit(html: str) -> None:
+            # Landmark blocks already seen on an earlier visit become boilerplate with this one,
+            # unless this is the same page unchanged
+            if store:
+                visit['body'] = body_fingerprint(html)
+                visit['new'] = store.is_new_visit(domain, page_url, visit['body'])
+
+        def is_boilerplate(block: str, landmark: bool) -> bool:
+            block_fingerprint = fingerprint(block, landmark)
+            seen[block_fingerprint] = landmark
+            return block_fingerprint in boilerplate or (visit['new'] and block_fingerprint in next_visit)
+
+        if subject:
+            def extract(html: str) -> str:
+                # Blocks are cached as JSON, so any subject can be ranked against them without another parse
+                start_visit(html)
+                return json.dumps(extract_blocks(html, MAX_PAGE_TEXT))
+
+            blocks, cache_outcome = _cached_extract(page_url, deadline, f"landmark-blocks:{MAX_PAGE_TEXT}", extract)
+            blocks = json.loads(blocks)
+            content = [block for block, landmark in blocks if not is_boilerplate(block, landmark)]
+            text, found = select_passages(content or [block for block, _ in blocks], subject, MAX_TEXT_LENGTH)
+            result = {'url': url, 'text': text, 'subject_found': found}
+        else:
+            def extract(html: str) -> str:
+                # Parsing stops once the visible text is longer than MAX_TEXT_LENGTH
+                start_visit(html)
+                text = extract_text(html, MAX_TEXT_LENGTH, is_boilerplate if store else None)
+                # A page made only of known boilerplate keeps its text
+                if not text and (boilerplate or next_visit):
+                    text = extract_text(html, MAX_TEXT_LENGTH)
+                return text
+
+            # Text extracted with an older set of boilerplate blocks is not reused
+            text, cache_outcome = _cached_extract(page_url, deadline, f"text:{MAX_TEXT_LENGTH}:{version}", extract)
+            result = {'url': url, 'text': text}
+
+        # Only a download (not a cached extract) is a visit to learn from
+        if store and visit['body'] and seen:
+            store.learn(domain, page_url, visit['body'], seen)
+        if cache_outcome:
+            result['cache'] = cache_outcome
+        return result
+    except Exception as e:
+        return {'error': str(e) or type(e).__name__, 'url': url}
+
 
 # Function to scrape info from a URL
-def scrape_url_info(url: str) -> str:
+def scrape_url_info(url: str, subject: Optional[str] = None) -> str:
     """
     Scrapes all visible text content from the given URL.
+    With a subject, returns the passages of the page most relevant to it instead of the start of the page.
     Returns a JSON string with the URL and the extracted text or error message.
     """
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        # Remove script and style elements
-        for tag in soup(['script', 'style', 'noscript']):
-            tag.decompose()
-        # Get visible text
-        text = soup.get_text(separator=' ', strip=True)
-        # Optionally, limit the length to avoid huge outputs
-        max_length = 5000
-        if len(text) > max_length:
-            text = text[:max_length] + '... [truncated]'
-        result = {
-            'url': url,
-            'text': text
-        }
-        return json.dumps(result)
-    except Exception as e:
-        return json.dumps({'error': str(e), 'url': url})
+    return json.dumps(_scrape(url, time.monotonic() + REQUEST_TIMEOUT, subject))
+
+
+# Function to scrape several URLs at once
+def scrape_urls(urls: List[str], subject: Optional[str] = None) -> str:
+    """
+    Scrapes the visible text of several URLs concurrently.
+    With a subject, each result holds the passages of its page most relevant to the subject.
+    A failed or slow URL does not affect the others. Every URL gets a result with either
+    its text or an error, and the whole batch finishes within SCRAPE_BATCH_TIMEOUT seconds.
+    A URL listed more than once is scraped once and its result is repeated for each listing.
+    Returns a JSON string with a list of results in the order of the URLs.
+    """
+    start = time.monotonic()
+    deadline = start + BATCH_TIMEOUT
+    unique_urls = list(dict.fromkeys(urls))
+    if not unique_urls:
+        return json.dumps({'results': [], 'elapsed_seconds': 0.0})
 
+    # Fetches stop at the deadline themselves, so shutting down only waits for a few in-flight reads
+    pool = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(unique_urls)))
+    futures = [pool.submit(_scrape, url, deadline, subject) for url in unique_urls]
+    scraped = {}
+    for url, future in zip(unique_urls, futures):
+        try:
+            scraped[url] = future.result(timeout=max(0.0, deadline - time.monotonic()) + 1)
+        except Exception:
+            future.cancel()
+            scraped[url] = {'error': 'timed out', 'url': url}
+    pool.shutdown(wait=False, cancel_futures=True)
 
+    # Cache hits count fetches, so a repeated URL counts once
+    cached = sum(1 for result in scraped.values() if result.get('cache') in ('fresh', 'revalidated', 'unchanged'))
+    return json.dumps({
+        'results': [scraped[url] for url in urls],
+        'elapsed_seconds': round(time.monotonic() - start, 2),
+        'cache_hits': cached
+    })
 
 
 # Function to save output to a Word document
@@ -54,6 +246,10 @@ def save_output_to_word(output: str, filename: str = "output.docx") -> str:
         if isinstance(data, dict) and 'url' in data and 'text' in data:
             doc.add_heading(f"Scraped Content from {data['url']}", level=1)
             doc.add_paragraph(data['text'])
+        elif isinstance(data, dict) and isinstance(data.get('results'), list):
+            for result in data['results']:
+                doc.add_heading(f"Scraped Content from {result.get('url')}", level=1)
+                doc.add_paragraph(result.get('text') or f"Error: {result.get('error')}")
         else:
             doc.add_paragraph(output)
     except Exception:
@@ -65,6 +261,7 @@ def save_output_to_word(output: str, filename: str = "output.docx") -> str:
 # Define a set of callable functions
 user_functions: Set[Callable[..., Any]] = {
     scrape_url_info,
+    scrape_urls,
     save_output_to_word
 }
 
@@ -1,10 +1,18 @@
 import os
+import re
+import csv
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 
 # Add references
 from azure.ai.agents import AgentsClient
 from azure.ai.agents.models import ConnectedAgentTool, MessageRole, ListSortOrder, ToolSet, FunctionTool
 from azure.identity import DefaultAzureCredential
+from agent_registry import AgentRegistry, registry_owner
 
 # Clear the console
 os.system('cls' if os.name=='nt' else 'clear')
@@ -14,6 +22,208 @@ load_dotenv()
 project_endpoint = os.getenv("PROJECT_ENDPOINT")
 model_deployment = os.getenv("MODEL_DEPLOYMENT_NAME")
 
+parser = argparse.ArgumentParser(description="Triage a support ticket with connected agents.")
+parser.add_argument("--mode", choices=["connected", "fanout", "compare"], default="connected",
+                    help="connected: triage agent calls the specialists; fanout: call the specialists "
+                         "in parallel and merge locally; compare: time both modes")
+parser.add_argument("--repeat", type=int, default=3, help="Runs of each mode when comparing")
+parser.add_argument("--batch", metavar="PATH",
+                    help="Triage every ticket in a directory of ticket-*.txt files or a CSV/JSONL file")
+parser.add_argument("--output", default="triage_results.jsonl",
+                    help="Batch results; tickets already in this file are skipped when a batch is rerun")
+parser.add_argument("--concurrency", type=int, default=4, help="Tickets triaged at once in batch mode")
+args = parser.parse_args()
+if args.batch and args.mode == "compare":
+    parser.error("--batch works with --mode connected or --mode fanout")
+
+# The answers each specialist agent may give, used to pull a label out of its reply
+TRIAGE_LABELS = {
+    "priority": ["High", "Medium", "Low"],
+    "team": ["Frontend", "Backend", "Infrastructure", "Marketing"],
+    "effort": ["Small", "Medium", "Large"],
+}
+
+
+def run_agent(agent_id: str, prompt: str) -> str:
+    # Run one agent on a new thread and return its reply; the thread is deleted afterwards
+    thread = agents_client.threads.create()
+    try:
+        agents_client.messages.create(thread_id=thread.id, role=MessageRole.USER, content=prompt)
+        run = agents_client.runs.create_and_process(thread_id=thread.id, agent_id=agent_id)
+        if run.status == "failed":
+            raise RuntimeError(f"Run failed: {run.last_error}")
+
+        last_msg = agents_client.messages.get_last_message_text_by_role(thread_id=thread.id, role=MessageRole.AGENT)
+        return last_msg.text.value if last_msg else ""
+    finally:
+        # A thread that can't be deleted mustn't fail the ticket, or a batch rerun would triage it again
+        try:
+            agents_client.threads.delete(thread.id)
+        except Exception as e:
+            print(f"Couldn't delete thread {thread.id}: {e}")
+
+
+def parse_label(reply: str, labels: list[str]) -> str | None:
+    # The label mentioned first in the reply wins
+    matches = [(m.start(), label) for label in labels for m in [re.search(rf"\b{label}\b", reply, re.IGNORECASE)] if m]
+    return min(matches)[1] if matches else None
+
+
+def timed_run(agent_id: str, prompt: str) -> tuple[str, float]:
+    start = time.perf_counter()
+    reply = run_agent(agent_id, prompt)
+    return reply, time.perf_counter() - start
+
+
+def triage_connected(triage_agent_id: str, prompt: str) -> dict:
+    reply, seconds = timed_run(triage_agent_id, prompt)
+    return {"reply": reply, "latency": {"triage": seconds}}
+
+
+def triage_fanout(specialists: dict[str, str], prompt: str) -> dict:
+    # Run every specialist on its own thread at once and merge their answers without an orchestrator run
+    with ThreadPoolExecutor(max_workers=len(specialists)) as pool:
+        futures = {field: pool.submit(timed_run, agent_id, prompt) for field, agent_id in specialists.items()}
+        outcomes = {field: future.result() for field, future in futures.items()}
+
+    result = {field: parse_label(reply, TRIAGE_LABELS[field]) for field, (reply, _) in outcomes.items()}
+    result["details"] = {field: reply for field, (reply, _) in outcomes.items()}
+    result["latency"] = {field: seconds for field, (_, seconds) in outcomes.items()}
+    return result
+
+
+def compare_modes(triage_agent_id: str, specialists: dict[str, str], prompt: str, repeat: int) -> None:
+    timings = {"connected": [], "fanout": []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_agent(triage_agent_id, prompt)
+        timings["connected"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        triage_fanout(specialists, prompt)
+        timings["fanout"].append(time.perf_counter() - start)
+
+    print(f"\n{'mode':<10} {'runs':>4} {'mean':>7} {'min':>7} {'max':>7}")
+    for mode, values in timings.items():
+        print(f"{mode:<10} {len(values):>4} {sum(values) / len(values):>6.2f}s {min(values):>6.2f}s {max(values):>6.2f}s")
+    speedup = sum(timings["connected"]) / sum(timings["fanout"])
+    print(f"Fan-out mode was {speedup:.1f}x faster than connected-agent mode for this ticket.")
+
+
+def ticket_fields(record: dict, index: int) -> tuple[str, str]:
+    ticket_id = record.get("id") or record.get("ticket_id") or record.get("ticket_number") or index
+    text = record.get("description") or record.get("text") or record.get("ticket") or ""
+    return str(ticket_id), text
+
+
+def read_tickets(path: str):
+    # Yield (ticket id, description) pairs one at a time so large backlogs aren't loaded up front
+    source = Path(path)
+    if source.is_dir():
+        for file in sorted(source.glob("ticket-*.txt")):
+            text = file.read_text()
+            yield file.stem.removeprefix("ticket-"), text.split("Description:\n", 1)[-1].strip()
+    elif source.suffix.lower() == ".csv":
+        with source.open(newline="") as f:
+            for index, row in enumerate(csv.DictReader(f)):
+                yield ticket_fields(row, index)
+    else:
+        with source.open() as f:
+            for index, line in enumerate(f):
+                if line.strip():
+                    yield ticket_fields(json.loads(line), index)
+
+
+def load_checkpoint(output_path: str) -> set[str]:
+    # Tickets already triaged successfully; failed ones are tried again
+    done = set()
+    path = Path(output_path)
+    if not path.exists():
+        return done
+
+    with path.open("rb+") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by a crash
+            if record.get("ok"):
+                done.add(record["id"])
+
+        # Start new records on a fresh line if the last one was cut short
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    return done
+
+
+def percentile(values: list[float], pct: float) -> float:
+    # Nearest-rank percentile of a non-empty list
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def triage_batch(path: str, output_path: str, concurrency: int, mode: str,
+                 triage_agent_id: str, specialists: dict[str, str]) -> None:
+    done = load_checkpoint(output_path)
+    if done:
+        print(f"Resuming: {len(done)} tickets in {output_path} are already triaged.")
+
+    stage_latencies: dict[str, list[float]] = {}
+    completed = failed = 0
+    start = time.perf_counter()
+
+    def triage_ticket(text: str) -> dict:
+        if mode == "fanout":
+            return triage_fanout(specialists, text)
+        return triage_connected(triage_agent_id, text)
+
+    with open(output_path, "a") as out, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = {}
+
+        def write_finished():
+            # Write each result as soon as it finishes so a crash loses at most the tickets in flight
+            nonlocal completed, failed
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                ticket_id = pending.pop(future)
+                try:
+                    record = {"id": ticket_id, "ok": True, **future.result()}
+                    for stage, seconds in record["latency"].items():
+                        stage_latencies.setdefault(stage, []).append(seconds)
+                except Exception as e:
+                    record = {"id": ticket_id, "ok": False, "error": str(e)}
+                    failed += 1
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+
+                completed += 1
+                if completed % 10 == 0:
+                    rate = completed / (time.perf_counter() - start) * 60
+                    print(f"Triaged {completed} tickets ({rate:.1f} tickets/min)")
+
+        # Keep a bounded number of tickets queued so memory stays flat however long the input is
+        for ticket_id, text in read_tickets(path):
+            if ticket_id in done:
+                continue
+            if len(pending) >= concurrency * 2:
+                write_finished()
+            pending[pool.submit(triage_ticket, text)] = ticket_id
+
+        while pending:
+            write_finished()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nTriaged {completed} tickets in {elapsed:.1f}s with {failed} failures "
+          f"({completed / elapsed * 60 if elapsed else 0:.1f} tickets/min). Results are in {output_path}.")
+    if stage_latencies:
+        print(f"{'stage':<10} {'p50':>7} {'p95':>7} {'mean':>7}")
+        for stage, values in stage_latencies.items():
+            print(f"{stage:<10} {percentile(values, 50):>6.2f}s {percentile(values, 95):>6.2f}s "
+                  f"{sum(values) / len(values):>6.2f}s")
+
 
 # Connect to the agents client
 agents_client = AgentsClient(
@@ -27,6 +237,8 @@ agents_client = AgentsClient(
 
 with agents_client:
 
+    # Reuse the agents from an earlier run when their definitions haven't changed
+    registry = AgentRegistry(agents_client, owner=registry_owner(__file__))
 
     # Create an agent to prioritize support tickets
     priority_agent_name = "priority_agent"
@@ -41,7 +253,7 @@ with agents_client:
     Only output the urgency level and a very brief explanation.
     """
 
-    priority_agent = agents_client.create_agent(
+    priority_agent = registry.get_or_create_agent(
         model=model_deployment,
         name=priority_agent_name,
         instructions=priority_agent_instructions
@@ -63,7 +275,7 @@ with agents_client:
     Base your answer on the content of the ticket. Respond with the team name and a very brief explanation.
     """
 
-    team_agent = agents_client.create_agent(
+    team_agent = registry.get_or_create_agent(
         model=model_deployment,
         name=team_agent_name,
         instructions=team_agent_instructions
@@ -84,7 +296,7 @@ with agents_client:
     Base your estimate on the complexity implied by the ticket. Respond with the effort level and a brief justification.
     """
 
-    effort_agent = agents_client.create_agent(
+    effort_agent = registry.get_or_create_agent(
         model=model_deployment,
         name=effort_agent_name,
         instructions=effort_agent_instructions
@@ -120,7 +332,7 @@ with agents_client:
     which team it should be assigned to, and how much effort it may take.
     """
 
-    triage_agent = agents_client.create_agent(
+    triage_agent = registry.get_or_create_agent(
         model=model_deployment,
         name=triage_agent_name,
         instructions=triage_agent_instructions,
@@ -133,45 +345,51 @@ with agents_client:
     
     
 
-    # Use the agents to triage a support issue
-    print("Creating agent thread.")
-    thread = agents_client.threads.create()  
+    # The specialist agents the fan-out mode calls directly
+    specialists = {"priority": priority_agent.id, "team": team_agent.id, "effort": effort_agent.id}
 
     # Create the ticket prompt
-    prompt = input("\nWhat's the support problem you need to resolve?: ")
-
-    # Send a prompt to the agent
-    message = agents_client.messages.create(
-        thread_id=thread.id,
-        role=MessageRole.USER,
-        content=prompt,
-    )   
-
-    # Run the thread usng the primary agent
-    print("\nProcessing agent thread. Please wait.")
-    run = agents_client.runs.create_and_process(thread_id=thread.id, agent_id=triage_agent.id)
-        
-    if run.status == "failed":
-        print(f"Run failed: {run.last_error}")
-
-    # Fetch and display messages
-    messages = agents_client.messages.list(thread_id=thread.id, order=ListSortOrder.ASCENDING)
-    for message in messages:
-        if message.text_messages:
-            last_msg = message.text_messages[-1]
-            print(f"{message.role}:\n{last_msg.text.value}\n")
-
-
-
-
-    # Clean up
-    print("Cleaning up agents:")
-    agents_client.delete_agent(triage_agent.id)
-    print("Deleted triage agent.")
-    agents_client.delete_agent(priority_agent.id)
-    print("Deleted priority agent.")
-    agents_client.delete_agent(team_agent.id)
-    print("Deleted team agent.")
-    agents_client.delete_agent(effort_agent.id)
-    print("Deleted effort agent.")
-
+    prompt = None if args.batch else input("\nWhat's the support problem you need to resolve?: ")
+
+    if args.batch:
+        print(f"\nTriaging tickets from {args.batch} in {args.mode} mode. Please wait.")
+        triage_batch(args.batch, args.output, args.concurrency, args.mode, triage_agent.id, specialists)
+
+    elif args.mode == "fanout":
+        print("\nTriaging with the specialist agents in parallel. Please wait.")
+        print(json.dumps(triage_fanout(specialists, prompt), indent=2))
+
+    elif args.mode == "compare":
+        print(f"\nTiming {args.repeat} runs of each mode. Please wait.")
+        compare_modes(triage_agent.id, specialists, prompt, args.repeat)
+
+    else:
+        # Use the agents to triage a support issue
+        print("Creating agent thread.")
+        thread = agents_client.threads.create()  
+
+        # Send a prompt to the agent
+        message = agents_client.messages.create(
+            thread_id=thread.id,
+            role=MessageRole.USER,
+            content=prompt,
+        )   
+
+        # Run the thread usng the primary agent
+        print("\nProcessing agent thread. Please wait.")
+        run = agents_client.runs.create_and_process(thread_id=thread.id, agent_id=triage_agent.id)
+            
+        if run.status == "failed":
+            print(f"Run failed: {run.last_error}")
+
+        # Fetch and display messages
+        messages = agents_client.messages.list(thread_id=thread.id, order=ListSortOrder.ASCENDING)
+        for message in messages:
+            if message.text_messages:
+                last_msg = message.text_messages[-1]
+                print(f"{message.role}:\n{last_msg.text.value}\n")
+
+
+
+    # Clean up old agent versions; the current agents are kept for the next run
+    registry.wait()
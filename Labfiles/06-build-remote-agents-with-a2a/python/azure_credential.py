@@ -0,0 +1,41 @@
+""" Process-wide async Azure credential shared by the Foundry agents clients """
+
+import os
+import time
+
+from azure.core.credentials import AccessToken
+from azure.identity.aio import DefaultAzureCredential
+
+_credential = None
+
+class StaticTokenCredential:
+    """Returns a fixed bearer token, for local stand-ins of the agents endpoint."""
+
+    def __init__(self, token: str):
+        self._token = token
+
+    async def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        return AccessToken(self._token, int(time.time()) + 3600)
+
+    async def close(self) -> None:
+        pass
+
+def get_azure_credential():
+    # Share one credential so every client in the process reuses the same cached token
+    global _credential
+    if _credential is None:
+        static_token = os.getenv('AZURE_AGENTS_STATIC_TOKEN')
+        if static_token:
+            _credential = StaticTokenCredential(static_token)
+        else:
+            _credential = DefaultAzureCredential(
+                exclude_environment_credential=True,
+                exclude_managed_identity_credential=True
+            )
+    return _credential
+
+async def close_azure_credential() -> None:
+    global _credential
+    if _credential is not None:
+        await _credential.close()
+        _credential = None
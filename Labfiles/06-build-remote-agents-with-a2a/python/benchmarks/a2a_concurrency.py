@@ -0,0 +1,54 @@
+""" Compares one A2A message/send call with N concurrent calls against a remote agent server """
+
+import argparse
+import asyncio
+import os
+import time
+import uuid
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+server = os.environ["SERVER_URL"]
+
+async def send_task(client: httpx.AsyncClient, url: str, text: str) -> bool:
+    message_id = str(uuid.uuid4())
+    payload = {
+        "jsonrpc": "2.0",
+        "id": message_id,
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "parts": [{"kind": "text", "text": text}],
+                "messageId": message_id,
+            },
+        },
+    }
+    response = await client.post(url, json=payload)
+    return response.status_code == 200 and "error" not in response.json()
+
+async def timed_batch(client: httpx.AsyncClient, url: str, text: str, count: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    results = await asyncio.gather(*(send_task(client, url, text) for _ in range(count)), return_exceptions=True)
+    failures = sum(1 for result in results if result is not True)
+    return time.perf_counter() - start, failures
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", default=os.environ["OUTLINE_AGENT_PORT"], help="Port of the A2A agent server")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--text", default="Write an outline for an article about React programming.")
+    args = parser.parse_args()
+
+    url = f"http://{server}:{args.port}/"
+    async with httpx.AsyncClient(timeout=300, limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        single, _ = await timed_batch(client, url, args.text, 1)
+        batch, failures = await timed_batch(client, url, args.text, args.concurrency)
+
+    print(f"1 call: {single:.2f}s")
+    print(f"{args.concurrency} concurrent calls: {batch:.2f}s ({failures} failed, {batch / single:.2f}x a single call)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,275 @@
+""" Local stand-in for the Azure AI Foundry agents endpoint, used by the offline benchmarks
+
+Implements the subset of the agents REST API used by the lab (agents, threads, messages,
+polled and streamed runs, tool outputs) with configurable run latency and tool-call behavior.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI()
+
+config = {
+    "run_latency": 0.5,
+    "jitter": 0.0,
+    # Remote agents that a routing run calls through send_message before completing
+    "tool_calls": ["AI Foundry Title Agent", "AI Foundry Outline Agent"],
+}
+
+agents: dict[str, dict] = {}
+threads: dict[str, list[dict]] = {}
+runs: dict[str, dict] = {}
+
+def new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+def message_json(thread_id: str, role: str, text: str, run_id: str | None = None) -> dict:
+    return {
+        "id": new_id("msg"),
+        "object": "thread.message",
+        "created_at": int(time.time()),
+        "thread_id": thread_id,
+        "status": "completed",
+        "role": role,
+        "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+        "assistant_id": None,
+        "run_id": run_id,
+        "attachments": [],
+        "metadata": {},
+    }
+
+def run_json(run: dict) -> dict:
+    return {key: value for key, value in run.items() if not key.startswith("_")}
+
+def run_delay() -> float:
+    return max(0.0, config["run_latency"] + random.uniform(-config["jitter"], config["jitter"]))
+
+def uses_send_message(agent: dict) -> bool:
+    return any(tool.get("function", {}).get("name") == "send_message" for tool in agent.get("tools") or [])
+
+def advance(run: dict) -> None:
+    # Move a run forward once its simulated work time has elapsed
+    if run["status"] not in ("queued", "in_progress") or time.monotonic() < run["_ready_at"]:
+        if run["status"] == "queued":
+            run["status"] = "in_progress"
+        return
+
+    agent = agents[run["assistant_id"]]
+    messages = threads[run["thread_id"]]
+    user_text = next((m["content"][0]["text"]["value"] for m in reversed(messages) if m["role"] == "user"), "")
+
+    if uses_send_message(agent) and config["tool_calls"] and not run["_tool_outputs"]:
+        run["status"] = "requires_action"
+        run["required_action"] = {
+            "type": "submit_tool_outputs",
+            "submit_tool_outputs": {
+                "tool_calls": [
+                    {
+                        "id": new_id("call"),
+                        "type": "function",
+                        "function": {
+                            "name": "send_message",
+                            "arguments": json.dumps({"agent_name": name, "task": user_text}),
+                        },
+                    }
+                    for name in config["tool_calls"]
+                ]
+            },
+        }
+        return
+
+    if run["_tool_outputs"]:
+        text = "Combined results: " + " | ".join(output["output"][:200] for output in run["_tool_outputs"])
+    else:
+        text = f"Stand-in response from {agent['name']} to: {user_text}"
+    messages.append(message_json(run["thread_id"], "assistant", text, run_id=run["id"]))
+    run["status"] = "completed"
+    run["completed_at"] = int(time.time())
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {data if isinstance(data, str) else json.dumps(data)}\n\n"
+
+async def stream_run(run: dict):
+    yield sse(f"thread.run.{run['status']}", run_json(run))
+    await asyncio.sleep(max(0.0, run["_ready_at"] - time.monotonic()))
+    advance(run)
+
+    if run["status"] == "requires_action":
+        yield sse("thread.run.requires_action", run_json(run))
+    else:
+        message = threads[run["thread_id"]][-1]
+        text = message["content"][0]["text"]["value"]
+        yield sse("thread.message.created", {**message, "status": "in_progress", "content": []})
+        for index, word in enumerate(text.split(" ")):
+            chunk = word if index == 0 else " " + word
+            yield sse("thread.message.delta", {
+                "id": message["id"],
+                "object": "thread.message.delta",
+                "delta": {"content": [{"index": 0, "type": "text", "text": {"value": chunk}}]},
+            })
+        yield sse("thread.message.completed", message)
+        yield sse("thread.run.completed", run_json(run))
+    yield sse("done", "[DONE]")
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+@app.post("/assistants")
+async def create_agent(request: Request):
+    body = await request.json()
+    agent = {
+        "id": new_id("asst"),
+        "object": "assistant",
+        "created_at": int(time.time()),
+        "name": body.get("name"),
+        "description": body.get("description"),
+        "model": body.get("model"),
+        "instructions": body.get("instructions"),
+        "tools": body.get("tools") or [],
+        "tool_resources": {},
+        "temperature": 1.0,
+        "top_p": 1.0,
+        "metadata": body.get("metadata") or {},
+    }
+    agents[agent["id"]] = agent
+    return agent
+
+@app.get("/assistants")
+async def list_agents(order: str = "desc", limit: int = 20, after: str | None = None):
+    ordered = sorted(agents.values(), key=lambda agent: agent["created_at"], reverse=order == "desc")
+
+    # The SDK pages with the previous page's last_id until a page comes back empty
+    if after:
+        ids = [agent["id"] for agent in ordered]
+        ordered = ordered[ids.index(after) + 1:] if after in ids else []
+    data = ordered[:limit]
+    return {
+        "object": "list",
+        "data": data,
+        "first_id": data[0]["id"] if data else None,
+        "last_id": data[-1]["id"] if data else None,
+        "has_more": len(ordered) > limit,
+    }
+
+@app.delete("/assistants/{agent_id}")
+async def delete_agent(agent_id: str):
+    agents.pop(agent_id, None)
+    return {"id": agent_id, "object": "assistant.deleted", "deleted": True}
+
+@app.post("/threads")
+async def create_thread():
+    thread_id = new_id("thread")
+    threads[thread_id] = []
+    return {"id": thread_id, "object": "thread", "created_at": int(time.time()), "metadata": {}}
+
+@app.delete("/threads/{thread_id}")
+async def delete_thread(thread_id: str):
+    threads.pop(thread_id, None)
+    return {"id": thread_id, "object": "thread.deleted", "deleted": True}
+
+@app.post("/threads/{thread_id}/messages")
+async def create_message(thread_id: str, request: Request):
+    body = await request.json()
+    content = body["content"] if isinstance(body["content"], str) else json.dumps(body["content"])
+    message = message_json(thread_id, body.get("role", "user"), content)
+    threads[thread_id].append(message)
+    return message
+
+@app.get("/threads/{thread_id}/messages")
+async def list_messages(thread_id: str, order: str = "desc", limit: int = 20):
+    messages = threads.get(thread_id, [])
+    ordered = list(reversed(messages)) if order == "desc" else list(messages)
+    data = ordered[:limit]
+    return {
+        "object": "list",
+        "data": data,
+        "first_id": data[0]["id"] if data else None,
+        "last_id": data[-1]["id"] if data else None,
+        "has_more": len(ordered) > limit,
+    }
+
+@app.post("/threads/{thread_id}/runs")
+async def create_run(thread_id: str, request: Request):
+    body = await request.json()
+    agent = agents[body["assistant_id"]]
+    run = {
+        "id": new_id("run"),
+        "object": "thread.run",
+        "thread_id": thread_id,
+        "assistant_id": agent["id"],
+        "status": "queued",
+        "required_action": None,
+        "last_error": None,
+        "model": agent["model"],
+        "instructions": agent["instructions"],
+        "tools": agent["tools"],
+        "created_at": int(time.time()),
+        "metadata": {},
+        "parallel_tool_calls": True,
+        "_ready_at": time.monotonic() + run_delay(),
+        "_tool_outputs": [],
+    }
+    runs[run["id"]] = run
+
+    if body.get("stream"):
+        return StreamingResponse(stream_run(run), media_type="text/event-stream")
+    return run_json(run)
+
+@app.get("/threads/{thread_id}/runs/{run_id}")
+async def get_run(thread_id: str, run_id: str):
+    run = runs[run_id]
+    advance(run)
+    return run_json(run)
+
+@app.post("/threads/{thread_id}/runs/{run_id}/submit_tool_outputs")
+async def submit_tool_outputs(thread_id: str, run_id: str, request: Request):
+    body = await request.json()
+    run = runs[run_id]
+    if run["status"] != "requires_action":
+        return JSONResponse({"error": {"message": f"Run {run_id} is not waiting for tool outputs"}}, status_code=400)
+
+    run["_tool_outputs"] = body.get("tool_outputs") or []
+    run["required_action"] = None
+    run["status"] = "in_progress"
+    run["_ready_at"] = time.monotonic() + run_delay()
+
+    if body.get("stream"):
+        return StreamingResponse(stream_run(run), media_type="text/event-stream")
+    return run_json(run)
+
+@app.post("/threads/{thread_id}/runs/{run_id}/cancel")
+async def cancel_run(thread_id: str, run_id: str):
+    run = runs[run_id]
+    run["status"] = "cancelled"
+    return run_json(run)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=10100)
+    parser.add_argument("--run-latency", type=float, default=config["run_latency"], help="Seconds each run takes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds added to each run")
+    parser.add_argument("--tool-calls", default=",".join(config["tool_calls"]),
+                        help="Comma-separated remote agent names a routing run calls; empty for none")
+    parser.add_argument("--ssl-certfile")
+    parser.add_argument("--ssl-keyfile")
+    args = parser.parse_args()
+
+    config["run_latency"] = args.run_latency
+    config["jitter"] = args.jitter
+    config["tool_calls"] = [name for name in args.tool_calls.split(",") if name]
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning",
+                ssl_certfile=args.ssl_certfile, ssl_keyfile=args.ssl_keyfile)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+""" Measures routing agent /message throughput at increasing concurrency """
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+server = os.environ["SERVER_URL"]
+port = os.environ["ROUTING_AGENT_PORT"]
+
+async def run_level(client: httpx.AsyncClient, prompt: str, concurrency: int, requests_per_worker: int) -> dict:
+    url = f"http://{server}:{port}/message"
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        # Each worker is its own session so its runs don't queue behind other workers
+        session_id = str(uuid.uuid4())
+        for _ in range(requests_per_worker):
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json={"message": prompt, "session_id": session_id})
+                if response.status_code != 200 or "error" in response.json():
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prompt", default="Create a title for an article about React programming.")
+    parser.add_argument("--levels", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=3, help="Requests per worker at each level")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",")]
+    limits = httpx.Limits(max_connections=max(levels))
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        print(f"{'concurrency':>11} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 (s)':>8}")
+        for level in levels:
+            result = await run_level(client, args.prompt, level, args.requests)
+            print(f"{result['concurrency']:>11} {result['requests']:>8} {result['errors']:>6} "
+                  f"{result['throughput']:>8.2f} {result['p50']:>8.2f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,221 @@
+""" Offline end-to-end benchmark of the title, outline and routing agent servers
+
+Starts the three servers against benchmarks/agents_stand_in.py instead of a Foundry project,
+sweeps /message concurrency and appends latency percentiles, requests per second and peak RSS
+per server to a JSONL results file. Requires the completed lab code.
+
+Run from the python folder: python -m benchmarks.offline_e2e
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from client import percentile
+
+HOST = "127.0.0.1"
+
+SERVERS = [
+    {"name": "title_agent_server", "module": "title_agent.server:app", "port_env": "TITLE_AGENT_PORT"},
+    {"name": "outline_agent_server", "module": "outline_agent.server:app", "port_env": "OUTLINE_AGENT_PORT"},
+    {"name": "routing_agent_server", "module": "routing_agent.server:app", "port_env": "ROUTING_AGENT_PORT"},
+]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+def write_self_signed_cert(directory: str) -> tuple[str, str]:
+    # The agents client only sends bearer tokens over HTTPS, so the stand-in needs a certificate
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, HOST)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(HOST))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "stand_in.pem")
+    key_path = os.path.join(directory, "stand_in.key")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+async def wait_for_health(url: str, verify, timeout: float = 60) -> bool:
+    async with httpx.AsyncClient(verify=verify) as client:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url, timeout=2)).status_code == 200:
+                    return True
+            except Exception:
+                pass
+            await asyncio.sleep(0.1)
+    return False
+
+def peak_rss_mb(pid: int) -> float | None:
+    # VmHWM is the process's peak resident set size (Linux only)
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+async def run_level(url: str, concurrency: int, requests_per_worker: int, prompt: str) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+
+        async def worker():
+            nonlocal errors
+            session_id = str(uuid.uuid4())
+            for _ in range(requests_per_worker):
+                start = time.perf_counter()
+                try:
+                    response = await client.post(url, json={"message": prompt, "session_id": session_id})
+                    if response.status_code != 200 or "error" in response.json():
+                        errors += 1
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=4, help="Requests per worker at each level")
+    parser.add_argument("--run-latency", type=float, default=0.5, help="Seconds each stand-in run takes")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tool-calls", default="AI Foundry Title Agent,AI Foundry Outline Agent",
+                        help="Remote agents each routing run calls; empty for none")
+    parser.add_argument("--prompt", default="Create a title and outline for an article about React programming.")
+    parser.add_argument("--label", default="", help="Name for this run in the results file")
+    parser.add_argument("--output", default="benchmarks/results.jsonl")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="a2a_bench_")
+    cert_path, key_path = write_self_signed_cert(workdir)
+    stand_in_port = free_port()
+
+    env = os.environ.copy()
+    env.update({
+        "PROJECT_ENDPOINT": f"https://{HOST}:{stand_in_port}",
+        "MODEL_DEPLOYMENT_NAME": "stand-in",
+        "AZURE_AGENTS_STATIC_TOKEN": "offline-benchmark",
+        "SSL_CERT_FILE": cert_path,
+        "SERVER_URL": HOST,
+        "TITLE_TASK_DB": os.path.join(workdir, "title_tasks.db"),
+        "OUTLINE_TASK_DB": os.path.join(workdir, "outline_tasks.db"),
+    })
+    for server in SERVERS:
+        env[server["port_env"]] = str(free_port())
+
+    processes: dict[str, subprocess.Popen] = {}
+    log = open(os.path.join(workdir, "servers.log"), "w")
+    try:
+        processes["stand_in"] = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.agents_stand_in", "--host", HOST, "--port", str(stand_in_port),
+             "--run-latency", str(args.run_latency), "--jitter", str(args.jitter), "--tool-calls", args.tool_calls,
+             "--ssl-certfile", cert_path, "--ssl-keyfile", key_path],
+            env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        if not await wait_for_health(f"https://{HOST}:{stand_in_port}/health", verify=cert_path):
+            raise RuntimeError("Agents stand-in failed to start")
+
+        # Remote agents first, then the routing agent that discovers them
+        for group in (SERVERS[:2], SERVERS[2:]):
+            for server in group:
+                processes[server["name"]] = subprocess.Popen(
+                    [sys.executable, "-m", "uvicorn", server["module"], "--host", HOST,
+                     "--port", env[server["port_env"]], "--log-level", "warning"],
+                    env=env, stdout=log, stderr=subprocess.STDOUT,
+                )
+            ready = await asyncio.gather(*(
+                wait_for_health(f"http://{HOST}:{env[server['port_env']]}/health", verify=False) for server in group
+            ))
+            if not all(ready):
+                raise RuntimeError(f"Servers failed to start; see {log.name}")
+
+        url = f"http://{HOST}:{env['ROUTING_AGENT_PORT']}/message"
+        levels = []
+        print(f"{'concurrency':>11} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50':>7} {'p90':>7} {'p99':>7}")
+        for concurrency in (int(level) for level in args.levels.split(",")):
+            result = await run_level(url, concurrency, args.requests, args.prompt)
+            levels.append(result)
+            print(f"{result['concurrency']:>11} {result['requests']:>8} {result['errors']:>6} {result['rps']:>8.2f} "
+                  f"{result['p50']:>7.2f} {result['p90']:>7.2f} {result['p99']:>7.2f}")
+
+        peak_rss = {server["name"]: peak_rss_mb(processes[server["name"]].pid) for server in SERVERS}
+        for name, rss in peak_rss.items():
+            print(f"{name}: peak RSS {rss:.1f} MB" if rss is not None else f"{name}: peak RSS unavailable")
+
+        record = {
+            "label": args.label,
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "run_latency": args.run_latency,
+            "jitter": args.jitter,
+            "tool_calls": [name for name in args.tool_calls.split(",") if name],
+            "levels": levels,
+            "peak_rss_mb": peak_rss,
+        }
+        with open(args.output, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"Results appended to {args.output}")
+
+    finally:
+        for process in reversed(list(processes.values())):
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        log.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
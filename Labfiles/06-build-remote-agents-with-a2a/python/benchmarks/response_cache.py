@@ -0,0 +1,74 @@
+""" Checks which requests the response cache treats as the same, and times lookups
+
+Run from the python folder: python -m benchmarks.response_cache
+"""
+
+import argparse
+import time
+
+from response_cache import ResponseCache
+
+# Requests that must share one cache entry
+SAME = [
+    'Create a title for an article about React programming.',
+    'create a title for an article about react programming',
+    '  Create a title for an   article about React programming!  ',
+]
+
+# Requests that differ in a content word, so none of them may be answered with another's response
+DIFFERENT = [
+    'Create a title for an article about React programming.',
+    'Create a title for an article about Rust programming.',
+    'Create a title for an article about C programming.',
+    'Create a title for an article about C# programming.',
+    'Create a title for an article about C++ programming.',
+    'Create an outline for an article about React programming.',
+    'Create a title for an article about React testing.',
+    'Create a title for a blog post about React programming.',
+]
+
+def check_keys() -> None:
+    cache = ResponseCache()
+    cache.put(SAME[0], ['same'])
+    for request in SAME:
+        assert cache.get(request) == ['same'], request
+
+    cache = ResponseCache()
+    for request in DIFFERENT:
+        cache.put(request, [request])
+    for request in DIFFERENT:
+        assert cache.get(request) == [request], request
+    assert cache.snapshot()['size'] == len(DIFFERENT)
+
+def check_ttl() -> None:
+    # Entries expire a fixed time after they are stored, even if they keep being read
+    cache = ResponseCache(ttl=0.2)
+    cache.put(SAME[0], ['same'])
+    time.sleep(0.15)
+    assert cache.get(SAME[0]) == ['same']
+    time.sleep(0.1)
+    assert cache.get(SAME[0]) is None
+    assert cache.snapshot()['size'] == 0 and cache.stats['expired'] == 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=1024, help='Entries in the cache')
+    parser.add_argument('--lookups', type=int, default=100_000, help='Lookups to time')
+    args = parser.parse_args()
+
+    check_keys()
+    check_ttl()
+    print('Key and TTL checks passed')
+
+    cache = ResponseCache(max_size=args.entries)
+    topics = [f'Create a title for an article about topic {i}.' for i in range(args.entries * 2)]
+    for topic in topics[:args.entries]:
+        cache.put(topic, [topic])
+    start = time.perf_counter()
+    for i in range(args.lookups):
+        cache.get(topics[i % len(topics)])
+    elapsed = time.perf_counter() - start
+    print(f'{args.lookups / elapsed:,.0f} lookups/s, {cache.snapshot()}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+""" Compares RSS growth and get/save latency of InMemoryTaskStore and SqliteTaskStore
+
+Run from the python folder: python -m benchmarks.task_store
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import Message, Part, Role, Task, TaskState, TaskStatus, TextPart
+from sqlite_task_store import SqliteTaskStore
+
+def make_task(context_id: str) -> Task:
+    # A finished task with a short history, similar to what the agent executors produce
+    history = [
+        Message(role=Role.user, parts=[Part(root=TextPart(text='Write an outline about React programming.'))],
+                message_id=str(uuid.uuid4()), context_id=context_id),
+        Message(role=Role.agent, parts=[Part(root=TextPart(text='Outline Agent is processing your request...'))],
+                message_id=str(uuid.uuid4()), context_id=context_id),
+    ]
+    return Task(
+        id=str(uuid.uuid4()),
+        context_id=context_id,
+        status=TaskStatus(state=TaskState.completed),
+        history=history,
+    )
+
+def rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def run_store(store_name: str, count: int) -> None:
+    if store_name == 'sqlite':
+        path = os.path.join(tempfile.mkdtemp(), 'tasks.db')
+        store = SqliteTaskStore(path)
+    else:
+        store = InMemoryTaskStore()
+
+    baseline = rss_mb()
+    task_ids = []
+
+    start = time.perf_counter()
+    for i in range(count):
+        task = make_task(context_id=f'context-{i % 1000}')
+        task_ids.append(task.id)
+        await store.save(task)
+    save_time = time.perf_counter() - start
+
+    if store_name == 'sqlite':
+        await store.flush()
+
+    # Read a spread of tasks back, most of which are no longer in the write buffer
+    sample = task_ids[::max(1, count // 10000)]
+    start = time.perf_counter()
+    for task_id in sample:
+        await store.get(task_id)
+    get_time = time.perf_counter() - start
+
+    print(f'{store_name:>8}: save {save_time / count * 1e6:8.1f} us/task  '
+          f'get {get_time / len(sample) * 1e6:8.1f} us/task  '
+          f'RSS growth {rss_mb() - baseline:8.1f} MB')
+
+    if store_name == 'sqlite':
+        await store.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=100_000)
+    parser.add_argument('--store', choices=['memory', 'sqlite'], help='Run a single store in this process')
+    args = parser.parse_args()
+
+    if args.store:
+        asyncio.run(run_store(args.store, args.tasks))
+        return
+
+    # Measure each store in its own process so RSS numbers don't overlap
+    for store_name in ('memory', 'sqlite'):
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.task_store', '--store', store_name, '--tasks', str(args.tasks)],
+            check=True
+        )
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,12 @@
 """ Client code that connects to the routing agent """
 
 import os
+import json
+import time
+import uuid
+import argparse
 import asyncio
+import httpx
 import requests
 from dotenv import load_dotenv
 
@@ -10,9 +15,12 @@ load_dotenv()
 server = os.environ["SERVER_URL"]
 port = os.environ["ROUTING_AGENT_PORT"]
 
+# Keep the conversation on one routing agent thread for this client session
+session_id = str(uuid.uuid4())
+
 def send_prompt(prompt: str):
     url = f"http://{server}:{port}/message"
-    payload = {"message": prompt}
+    payload = {"message": prompt, "session_id": session_id}
     try:
         response = requests.post(url, json=payload)
         if response.status_code == 200:
@@ -32,5 +40,74 @@ async def main():
         response = send_prompt(user_input)
         print(f"Agent: {response}")
 
+def percentile(values: list[float], pct: float) -> float:
+    # Nearest-rank percentile of a non-empty list
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def send_prompt_async(client: httpx.AsyncClient, prompt: str, prompt_session_id: str) -> tuple[bool, str]:
+    url = f"http://{server}:{port}/message"
+    payload = {"message": prompt, "session_id": prompt_session_id}
+    try:
+        response = await client.post(url, json=payload)
+        if response.status_code != 200:
+            return False, f"Error {response.status_code}: {response.text}"
+        data = response.json()
+        if "error" in data:
+            return False, data["error"]
+        return True, data.get("response", "No response from agent.")
+    except Exception as e:
+        return False, f"Request failed: {e}"
+
+async def batch_main(input_path: str, output_path: str, concurrency: int):
+    # Send every prompt in a JSONL file over one keep-alive connection pool
+    with open(input_path) as f:
+        items = [json.loads(line) for line in f if line.strip()]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        with open(output_path, "w") as out:
+
+            async def run_item(index: int, item: dict):
+                nonlocal errors
+                prompt = item.get("prompt") or item.get("message")
+                prompt_session_id = item.get("session_id") or str(uuid.uuid4())
+                async with semaphore:
+                    start = time.perf_counter()
+                    ok, response = await send_prompt_async(client, prompt, prompt_session_id)
+                    latency = time.perf_counter() - start
+                latencies.append(latency)
+                if not ok:
+                    errors += 1
+                # Write each result as soon as it finishes
+                out.write(json.dumps({"index": index, "prompt": prompt, "ok": ok, "response": response, "latency": latency}) + "\n")
+                out.flush()
+
+            start = time.perf_counter()
+            await asyncio.gather(*(run_item(index, item) for index, item in enumerate(items)))
+            elapsed = time.perf_counter() - start
+
+    if not latencies:
+        print("No prompts found.")
+        return
+
+    print(f"Prompts: {len(latencies)}  Concurrency: {concurrency}  Elapsed: {elapsed:.2f}s")
+    print(f"Latency p50: {percentile(latencies, 50):.2f}s  p90: {percentile(latencies, 90):.2f}s  p99: {percentile(latencies, 99):.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.2f} prompts/s  Error rate: {errors / len(latencies):.1%}")
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Chat with the routing agent, or send a batch of prompts.")
+    parser.add_argument("--batch", metavar="PROMPTS_JSONL", help="JSONL file with one {\"prompt\": ...} object per line")
+    parser.add_argument("--output", default="responses.jsonl", help="Where to write batch responses")
+    parser.add_argument("--concurrency", type=int, default=8, help="Prompts in flight at once in batch mode")
+    args = parser.parse_args()
+
+    if args.batch:
+        asyncio.run(batch_main(args.batch, args.output, args.concurrency))
+    else:
+        asyncio.run(main())
@@ -2,23 +2,24 @@
 
 import os
 
-from azure.ai.agents import AgentsClient
+from azure.ai.agents.aio import AgentsClient
 from azure.ai.agents.models import Agent, MessageRole, ListSortOrder
-from azure.identity import DefaultAzureCredential
+from agent_registry import AsyncAgentRegistry, registry_owner
+from azure_credential import get_azure_credential
 
 class OutlineAgent:
 
     def __init__(self):
 
-        # Create the agents client
+        # Create the async agents client so runs don't block the server's event loop
         self.client = AgentsClient(
             endpoint=os.environ['PROJECT_ENDPOINT'],
-            credential=DefaultAzureCredential(
-                exclude_environment_credential=True,
-                exclude_managed_identity_credential=True
-            )
+            credential=get_azure_credential()
         )
 
+        # Reuse the agent from an earlier start when its definition hasn't changed
+        self.registry = AsyncAgentRegistry(self.client, owner=registry_owner(__file__))
+
         self.agent: Agent | None = None
 
     async def create_agent(self) -> Agent:
@@ -26,7 +27,7 @@ class OutlineAgent:
             return self.agent
 
         # Create the title agent
-        self.agent = self.client.create_agent(
+        self.agent = await self.registry.get_or_create_agent(
             model=os.environ['MODEL_DEPLOYMENT_NAME'],
             name='foundry-outline-agent',
             instructions="""
@@ -37,27 +38,24 @@ class OutlineAgent:
         )
         return self.agent
 
-    async def run_conversation(self, user_message: str) -> list[str]:
+    async def run_conversation(self, user_message: str, thread_id: str) -> list[str]:
         if not self.agent:
             await self.create_agent()
 
-        # Create a thread for the chat session
-        thread = self.client.threads.create()
-
         # Send user message
-        self.client.messages.create(thread_id=thread.id, role=MessageRole.USER, content=user_message)
+        await self.client.messages.create(thread_id=thread_id, role=MessageRole.USER, content=user_message)
 
         # Create and run the agent
-        run = self.client.runs.create_and_process(thread_id=thread.id, agent_id=self.agent.id)
+        run = await self.client.runs.create_and_process(thread_id=thread_id, agent_id=self.agent.id)
 
         if run.status == 'failed':
             print(f'Title Agent: Run failed - {run.last_error}')
             return [f'Error: {run.last_error}']
 
         # Get response messages
-        messages = self.client.messages.list(thread_id=thread.id, order=ListSortOrder.DESCENDING)
+        messages = self.client.messages.list(thread_id=thread_id, order=ListSortOrder.DESCENDING)
         responses = []
-        for msg in messages:
+        async for msg in messages:
             # Only get the latest assistant response
             if msg.role == 'assistant' and msg.text_messages:
                 for text_msg in msg.text_messages:
@@ -66,6 +64,10 @@ class OutlineAgent:
 
         return responses if responses else ['No response received']
 
+    async def close(self) -> None:
+        await self.registry.close()
+        await self.client.close()
+
 async def create_foundry_outline_agent() -> OutlineAgent:
     agent = OutlineAgent()
     await agent.create_agent()
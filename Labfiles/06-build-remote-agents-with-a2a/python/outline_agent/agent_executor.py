@@ -1,11 +1,16 @@
 """ Azure AI Foundry Agent that generates an outline """
 
+import os
+
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
 from a2a.server.events.event_queue import EventQueue
 from a2a.server.tasks import TaskUpdater
 from a2a.types import AgentCard, Part, TaskState
 from a2a.utils.message import new_agent_text_message
+from azure_credential import close_azure_credential
+from response_cache import CachedConversationAgent, ResponseCache
+from thread_cache import ThreadCache
 from outline_agent.agent import OutlineAgent, create_foundry_outline_agent
 
 # An AgentExecutor that runs Azure AI Foundry-based agents. Adapted from the ADK agent executor pattern.
@@ -14,11 +19,27 @@ class OutlineAgentExecutor(AgentExecutor):
     def __init__(self, card: AgentCard):
         self._card = card
         self._foundry_agent: OutlineAgent | None = None
+        self._threads: ThreadCache | None = None
+        self._cached_agent: CachedConversationAgent | None = None
+
+        # Repeated topics are answered from memory instead of a new Foundry run
+        self._response_cache = ResponseCache(
+            max_size=int(os.getenv('RESPONSE_CACHE_SIZE', '1024')),
+            ttl=float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '600'))
+        )
 
-    async def _get_or_create_agent(self) -> OutlineAgent:
+    async def _get_or_create_agent(self) -> CachedConversationAgent:
         if not self._foundry_agent:
             self._foundry_agent = await create_foundry_outline_agent()
-        return self._foundry_agent
+
+            # Follow-up messages in the same A2A context reuse one Foundry thread
+            self._threads = ThreadCache(
+                self._foundry_agent.client,
+                max_size=int(os.getenv('CONTEXT_THREAD_CACHE_SIZE', '256')),
+                ttl=float(os.getenv('CONTEXT_THREAD_TTL_SECONDS', '1800'))
+            )
+            self._cached_agent = CachedConversationAgent(self._foundry_agent, self._response_cache)
+        return self._cached_agent
 
     async def _process_request(self, message_parts: list[Part], context_id: str, task_updater: TaskUpdater) -> None:
         # Process a user request through the Foundry agent
@@ -36,8 +57,9 @@ class OutlineAgentExecutor(AgentExecutor):
                 message=new_agent_text_message('Outline Agent is processing your request...', context_id=context_id)
             )
 
-            # Run the conversation
-            responses = await agent.run_conversation(user_message)
+            # Run the conversation on the thread for this context
+            async with self._threads.session(context_id) as thread_id:
+                responses = await agent.run_conversation(user_message, thread_id)
 
             # Update the task with responses
             for response in responses:
@@ -78,5 +100,16 @@ class OutlineAgentExecutor(AgentExecutor):
             message=new_agent_text_message('Task cancelled by user', context_id=context.context_id)
         )
 
+    def cache_stats(self) -> dict:
+        return self._response_cache.snapshot()
+
+    async def close(self) -> None:
+        # Delete cached threads, then release the Foundry client and the shared credential
+        if self._threads:
+            await self._threads.close()
+        if self._foundry_agent:
+            await self._foundry_agent.close()
+        await close_azure_credential()
+
 def create_foundry_agent_executor(card: AgentCard) -> OutlineAgentExecutor:
     return OutlineAgentExecutor(card)
@@ -1,15 +1,17 @@
 import os
 import uvicorn
 
+from contextlib import asynccontextmanager
+
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
 from dotenv import load_dotenv
 from outline_agent.agent_executor import create_foundry_agent_executor
+from sqlite_task_store import SqliteTaskStore
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import PlainTextResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 from starlette.routing import Route
 
 load_dotenv()
@@ -46,9 +48,15 @@ agent_card = AgentCard(
 # Create agent executor
 agent_executor = create_foundry_agent_executor(agent_card)
 
+# Persist tasks in SQLite so they survive restarts and don't accumulate in memory
+task_store = SqliteTaskStore(
+    os.getenv('OUTLINE_TASK_DB', 'outline_tasks.db'),
+    compact_after=float(os.getenv('TASK_COMPACT_AFTER_SECONDS', '3600'))
+)
+
 # Create request handler
 request_handler = DefaultRequestHandler(
-    agent_executor=agent_executor, task_store=InMemoryTaskStore()
+    agent_executor=agent_executor, task_store=task_store
 )
 
 # Create A2A application
@@ -65,8 +73,21 @@ async def health_check(request: Request) -> PlainTextResponse:
 
 routes.append(Route(path='/health', methods=['GET'], endpoint=health_check))
 
+# Add response cache statistics endpoint
+async def cache_stats(request: Request) -> JSONResponse:
+    return JSONResponse(agent_executor.cache_stats())
+
+routes.append(Route(path='/cache/stats', methods=['GET'], endpoint=cache_stats))
+
+# Close the Foundry client and flush the task store when the server stops
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    yield
+    await agent_executor.close()
+    await task_store.close()
+
 # Create Starlette app
-app = Starlette(routes=routes)
+app = Starlette(routes=routes, lifespan=lifespan)
 
 def main():
     # Run the server
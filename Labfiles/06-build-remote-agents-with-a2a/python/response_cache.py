@@ -0,0 +1,105 @@
+""" Response cache for the Foundry agents, keyed on the normalized request text """
+
+import re
+import time
+from collections import OrderedDict
+
+from azure.ai.agents.models import MessageRole
+
+def normalize(text: str) -> str:
+    # Requests that differ only in casing, spacing or closing punctuation share a key.
+    # Punctuation inside the text is kept, so "C", "C#" and "C++" stay different requests.
+    text = ' '.join(text.lower().split())
+    return re.sub(r'[\s.!?]+$', '', text)
+
+class ResponseCache:
+    """LRU cache of responses for exact repeats of a request, each kept for at most ttl seconds."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 600):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # key -> (responses, stored_at); a hit does not extend an entry's lifetime
+        self._entries: OrderedDict[str, tuple[list[str], float]] = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    def get(self, request: str) -> list[str] | None:
+        if self.max_size <= 0:
+            return None
+        key = normalize(request)
+
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] >= self.ttl:
+            del self._entries[key]
+            self.stats['expired'] += 1
+            entry = None
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return entry[0]
+
+    def put(self, request: str, responses: list[str]) -> None:
+        if self.max_size <= 0:
+            return
+        key = normalize(request)
+        self._entries[key] = (responses, time.monotonic())
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def snapshot(self) -> dict:
+        return {**self.stats, 'size': len(self._entries), 'max_size': self.max_size}
+
+class CachedConversationAgent:
+    """Wraps an agent so the first turn of a conversation is served from a ResponseCache when possible."""
+
+    def __init__(self, agent, cache: ResponseCache, max_tracked_threads: int = 4096):
+        self.agent = agent
+        self.cache = cache
+        self.max_tracked_threads = max_tracked_threads
+
+        # thread_id -> cached (request, responses) not yet written to the thread, or None
+        self._threads: OrderedDict[str, tuple[str, list[str]] | None] = OrderedDict()
+
+    def __getattr__(self, name):
+        return getattr(self.agent, name)
+
+    async def run_conversation(self, user_message: str, thread_id: str) -> list[str]:
+        # Follow-up turns depend on the conversation so far, so only first turns use the cache
+        first_turn = thread_id not in self._threads
+
+        if first_turn:
+            responses = self.cache.get(user_message)
+            if responses is not None:
+                self._track(thread_id, (user_message, responses))
+                return responses
+        else:
+            await self._replay_cached_turn(thread_id)
+
+        responses = await self.agent.run_conversation(user_message, thread_id)
+        self._track(thread_id, None)
+
+        if first_turn and responses and not responses[0].startswith('Error') and responses != ['No response received']:
+            self.cache.put(user_message, responses)
+        return responses
+
+    async def _replay_cached_turn(self, thread_id: str) -> None:
+        # Write a cached first turn into the thread so the next run sees it as history
+        cached_turn = self._threads.get(thread_id)
+        if not cached_turn:
+            return
+        request, responses = cached_turn
+        await self.agent.client.messages.create(thread_id=thread_id, role=MessageRole.USER, content=request)
+        await self.agent.client.messages.create(thread_id=thread_id, role=MessageRole.AGENT, content=responses[-1])
+        self._threads[thread_id] = None
+
+    def _track(self, thread_id: str, cached_turn: tuple[str, list[str]] | None) -> None:
+        self._threads[thread_id] = cached_turn
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > self.max_tracked_threads:
+            self._threads.popitem(last=False)
@@ -3,45 +3,266 @@ import json
 import os
 import time
 import uuid
+from contextvars import ContextVar
 import httpx
 
-from typing import Any, Callable
-from azure.ai.agents import AgentsClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import ListSortOrder, FunctionTool, MessageRole
-from collections.abc import Callable
+from typing import Any, AsyncIterator, Callable
+from azure.ai.agents.aio import AgentsClient
+from azure.ai.agents.models import (
+    AsyncAgentEventHandler,
+    FunctionTool,
+    ListSortOrder,
+    MessageDeltaChunk,
+    MessageRole,
+    SubmitToolOutputsAction,
+    ThreadRun,
+)
+from collections.abc import Awaitable, Callable
 from dotenv import load_dotenv
-from a2a.client import A2ACardResolver, A2AClient
+from agent_registry import AsyncAgentRegistry, registry_owner
+from azure_credential import close_azure_credential, get_azure_credential
+from thread_cache import ThreadCache
+from routing_agent.card_cache import AgentCardCache
+from routing_agent.http_pool import get_http_client
+from routing_agent.resilience import CircuitBreaker, LatencyWindow
+from a2a.client import A2AClient
 from a2a.types import (
     AgentCard,
+    JSONRPCErrorResponse,
     MessageSendParams,
     SendMessageRequest,
     SendMessageResponse,
     SendMessageSuccessResponse,
+    SendStreamingMessageRequest,
+    SendStreamingMessageResponse,
+    SendStreamingMessageSuccessResponse,
     Task,
     TaskArtifactUpdateEvent,
     TaskStatusUpdateEvent,
+    TransportProtocol,
 )
 
 load_dotenv()
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
+RemoteEventCallback = Callable[[str, Any], Awaitable[None]]
+
+# Run polling starts tight right after runs.create and backs off toward a cap
+RUN_POLL_INITIAL_INTERVAL = float(os.getenv("RUN_POLL_INITIAL_INTERVAL", "0.1"))
+RUN_POLL_MAX_INTERVAL = float(os.getenv("RUN_POLL_MAX_INTERVAL", "1.0"))
+RUN_POLL_BACKOFF = 1.5
+
+# Upper bound for a single remote agent call made from a tool call
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "60"))
+
+# Bounds for the per-session conversation threads
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "256"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+
+# Remote agent cards are cached on disk and revalidated once they are older than the TTL
+AGENT_CARD_CACHE_PATH = os.getenv("AGENT_CARD_CACHE_PATH", ".agent_card_cache.json")
+AGENT_CARD_CACHE_TTL = float(os.getenv("AGENT_CARD_CACHE_TTL", "300"))
+CARD_RESOLVE_ATTEMPTS = 3
+
+# A remote agent's circuit opens after consecutive failures and is probed again after the reset timeout
+A2A_BREAKER_FAILURE_THRESHOLD = int(os.getenv("A2A_BREAKER_FAILURE_THRESHOLD", "5"))
+A2A_BREAKER_RESET_SECONDS = float(os.getenv("A2A_BREAKER_RESET_SECONDS", "30"))
+
+# When a remote agent has more than one URL, a duplicate request can go to the next URL after its p95 latency
+A2A_HEDGE_REQUESTS = os.getenv("A2A_HEDGE_REQUESTS", "false").lower() in ("1", "true", "yes")
+A2A_HEDGE_DEFAULT_DELAY = float(os.getenv("A2A_HEDGE_DEFAULT_DELAY", "2.0"))
+A2A_HEDGE_MIN_SAMPLES = 20
+
+# Events buffered for a streaming client; the run waits for a slow client instead of piling up events
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+
+# The routing thread whose tool calls are being dispatched. It is sent to remote agents as the A2A contextId,
+# so they keep one thread per routing conversation instead of starting a new one for every call.
+_routing_context_id: ContextVar[str | None] = ContextVar('routing_context_id', default=None)
 
 
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
 
     def __init__(self, agent_card: AgentCard, agent_url: str):
-        self._httpx_client = httpx.AsyncClient(timeout=30)
+        # All remote agents share the process-wide connection pool
+        self._httpx_client = get_http_client()
         self.agent_client = A2AClient(self._httpx_client, agent_card, url=agent_url)
         self.card = agent_card
 
+        # Extra JSON-RPC endpoints from the card are hedging targets
+        self.urls = [agent_url] + [
+            interface.url for interface in agent_card.additional_interfaces or []
+            if interface.transport == TransportProtocol.jsonrpc and interface.url.rstrip('/') != agent_url.rstrip('/')
+        ]
+        self.hedge_clients = [A2AClient(self._httpx_client, agent_card, url=url) for url in self.urls[1:]]
+
+        self.breaker = CircuitBreaker(A2A_BREAKER_FAILURE_THRESHOLD, A2A_BREAKER_RESET_SECONDS)
+        # A stream lasts as long as the whole remote task, so only unary latencies set the hedge delay
+        self.unary_latencies = LatencyWindow()
+        self.streaming_latencies = LatencyWindow()
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+
     def get_agent(self) -> AgentCard:
         return self.card
 
+    def _set_context(self, message_request: SendMessageRequest | SendStreamingMessageRequest) -> None:
+        # Messages sent while dispatching a routing run's tool calls belong to that run's conversation
+        message = message_request.params.message
+        if message.context_id is None:
+            message.context_id = _routing_context_id.get()
+
     async def send_message(self, message_request: SendMessageRequest) -> SendMessageResponse:
-        return await self.agent_client.send_message(message_request)
+        # Fail fast while the circuit is open; timeouts and cancellations count as failures
+        self._set_context(message_request)
+        self.breaker.before_call()
+        start = time.perf_counter()
+        try:
+            if A2A_HEDGE_REQUESTS and self.hedge_clients:
+                response = await self._send_hedged(message_request)
+            else:
+                response = await self.agent_client.send_message(message_request)
+        except BaseException:
+            self.breaker.record_failure()
+            raise
+
+        # A JSON-RPC error is a failed call even though the HTTP request succeeded
+        if isinstance(response.root, JSONRPCErrorResponse):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            self.unary_latencies.add(time.perf_counter() - start)
+        return response
+
+    async def send_message_streaming(self, message_request: SendStreamingMessageRequest) -> AsyncIterator[SendStreamingMessageResponse]:
+        self._set_context(message_request)
+        self.breaker.before_call()
+        start = time.perf_counter()
+        failed = False
+        try:
+            async for response in self.agent_client.send_message_streaming(message_request):
+                failed = failed or isinstance(response.root, JSONRPCErrorResponse)
+                yield response
+        except GeneratorExit:
+            # The caller stopped reading, which says nothing about the remote agent's health
+            # unless it stopped at an error event
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            self.breaker.record_failure()
+            raise
+
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            self.streaming_latencies.add(time.perf_counter() - start)
+
+    def hedge_delay(self) -> float:
+        # Wait for the p95 latency before hedging, once there are enough samples to trust it
+        if len(self.unary_latencies) < A2A_HEDGE_MIN_SAMPLES:
+            return A2A_HEDGE_DEFAULT_DELAY
+        return self.unary_latencies.percentile(95)
+
+    async def _send_hedged(self, message_request: SendMessageRequest) -> SendMessageResponse:
+        # Start on the primary URL, then race the next URL if the primary is slow or fails.
+        # A JSON-RPC error response counts as failing; it is returned only if both attempts fail.
+        def succeeded(task: asyncio.Task) -> bool:
+            return task.exception() is None and not isinstance(task.result().root, JSONRPCErrorResponse)
+
+        primary = asyncio.create_task(self.agent_client.send_message(message_request))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if primary in done and succeeded(primary):
+                return primary.result()
+
+            self.hedges_sent += 1
+            hedge = asyncio.create_task(self.hedge_clients[0].send_message(message_request))
+            pending = {hedge} if primary in done else {primary, hedge}
+            failed = primary if primary in done else None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if succeeded(task):
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    failed = task
+            if failed.exception() is not None:
+                raise failed.exception()
+            return failed.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            'urls': self.urls,
+            'breaker': self.breaker.snapshot(),
+            'latency_p50': self.unary_latencies.percentile(50),
+            'latency_p95': self.unary_latencies.percentile(95),
+            'streaming_latency_p50': self.streaming_latencies.percentile(50),
+            'streaming_latency_p95': self.streaming_latencies.percentile(95),
+            'hedges_sent': self.hedges_sent,
+            'hedge_wins': self.hedge_wins,
+            'hedge_win_rate': self.hedge_wins / self.hedges_sent if self.hedges_sent else None,
+        }
+
+
+class RoutingStreamHandler(AsyncAgentEventHandler):
+    """Relays routing run events, and remote task events from its tool calls, to a queue."""
+
+    def __init__(self, routing_agent: 'RoutingAgent', queue: asyncio.Queue):
+        super().__init__()
+        self.routing_agent = routing_agent
+        self.queue = queue
+        self.run: ThreadRun | None = None
+
+    async def publish(self, event: str, data: Any) -> None:
+        await self.queue.put({"event": event, "data": json.dumps(data)})
+
+    async def on_message_delta(self, delta: MessageDeltaChunk) -> None:
+        await self.publish("delta", {"text": delta.text})
+
+    async def on_thread_run(self, run: ThreadRun) -> None:
+        self.run = run
+        await self.publish("run_status", {"run_id": run.id, "status": run.status})
+
+        if run.status == "failed":
+            await self.publish("error", {"error": f"Run error: {run.last_error}"})
+
+        if run.status == "requires_action" and isinstance(run.required_action, SubmitToolOutputsAction):
+            tool_calls = run.required_action.submit_tool_outputs.tool_calls
+
+            # Remote agents stream their task updates back through publish_remote_event
+            tool_outputs = await asyncio.gather(
+                *(self.routing_agent._dispatch_tool_call(tool_call, run.thread_id, on_event=self.publish_remote_event)
+                  for tool_call in tool_calls)
+            )
+
+            # Continue the same stream with the tool outputs
+            await self.routing_agent.agents_client.runs.submit_tool_outputs_stream(
+                thread_id=run.thread_id, run_id=run.id, tool_outputs=tool_outputs, event_handler=self
+            )
+
+    async def on_error(self, data: str) -> None:
+        await self.publish("error", {"error": data})
+
+    async def publish_remote_event(self, agent_name: str, event: Any) -> None:
+        if isinstance(event, TaskStatusUpdateEvent):
+            event_name = "remote_status"
+        elif isinstance(event, TaskArtifactUpdateEvent):
+            event_name = "remote_artifact"
+        else:
+            event_name = "remote_task"
+        await self.publish(event_name, {"agent": agent_name, **event.model_dump(mode="json", exclude_none=True)})
 
 class RoutingAgent:
 
@@ -51,18 +272,24 @@ class RoutingAgent:
         self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
         self.cards: dict[str, AgentCard] = {}
         self.agents: str = ''
+        self.card_cache = AgentCardCache(AGENT_CARD_CACHE_PATH, ttl=AGENT_CARD_CACHE_TTL)
+        self._background_tasks: set[asyncio.Task] = set()
         
-        # Initialize Azure AI Agents client
+        # Initialize the async Azure AI Agents client so polling never blocks the event loop
         self.agents_client = AgentsClient(
             endpoint=os.environ["PROJECT_ENDPOINT"],
-            credential=DefaultAzureCredential(
-                exclude_environment_credential=True,
-                exclude_managed_identity_credential=True
-            )
+            credential=get_azure_credential()
         )
 
+        # Reuse the routing agent from an earlier start when its definition hasn't changed
+        self.registry = AsyncAgentRegistry(self.agents_client, owner=registry_owner(__file__))
+
         self.azure_agent = None
-        self.current_thread = None
+
+        # Each client session gets its own thread so conversations can run in parallel
+        self.threads = ThreadCache(
+            self.agents_client, max_size=SESSION_CACHE_SIZE, ttl=SESSION_TTL_SECONDS
+        )
 
 
     @classmethod
@@ -73,6 +300,9 @@ class RoutingAgent:
         return instance
     
 
+    def remote_agent_stats(self) -> dict[str, dict]:
+        return {name: connection.stats() for name, connection in self.remote_agent_connections.items()}
+
     def list_remote_agents(self) -> str:
         if not self.remote_agent_connections:
             return "[]"
@@ -87,22 +317,59 @@ class RoutingAgent:
     async def _async_init_components(self, remote_agent_addresses: list[str]) -> None:
         """Asynchronous part of initialization."""
 
-        # Use a single httpx.AsyncClient for all card resolutions for efficiency
-        async with httpx.AsyncClient(timeout=30) as client:
-            for address in remote_agent_addresses:
-                card_resolver = A2ACardResolver(client, address)
-                try:
-                    card = await card_resolver.get_agent_card()
-
-                    remote_connection = RemoteAgentConnections(agent_card=card, agent_url=address)
-                    self.remote_agent_connections[card.name] = remote_connection
-                    self.cards[card.name] = card
-
-                except httpx.ConnectError as e:
+        # Start from cached cards right away; only addresses without one are resolved before startup
+        uncached = []
+        for address in remote_agent_addresses:
+            card = self.card_cache.get(address)
+            if card:
+                self._register_card(address, card)
+            else:
+                uncached.append(address)
+
+        await self._resolve_cards(uncached)
+
+        # Revalidate expired cached cards in the background
+        stale = [address for address in remote_agent_addresses
+                 if address not in uncached and not self.card_cache.is_fresh(address)]
+        if stale:
+            task = asyncio.create_task(self._resolve_cards(stale))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+        print(f"Found remote agents: {self.list_remote_agents()}")
+
+    async def _resolve_cards(self, addresses: list[str]) -> None:
+        # Resolve every card concurrently over the shared connection pool
+        if not addresses:
+            return
+        client = get_http_client()
+        await asyncio.gather(*(self._resolve_card(client, address) for address in addresses))
+
+    async def _resolve_card(self, client: httpx.AsyncClient, address: str) -> None:
+        # Retry connection errors briefly, since a remote agent may still be booting
+        for attempt in range(CARD_RESOLVE_ATTEMPTS):
+            try:
+                card = await self.card_cache.resolve(client, address)
+                self._register_card(address, card)
+                return
+
+            except httpx.ConnectError as e:
+                if attempt + 1 == CARD_RESOLVE_ATTEMPTS:
                     print( f'ERROR: Failed to get agent card from {address}: {e}')
-                except Exception as e:  # Catch other potential errors
-                    print(f'ERROR: Failed to initialize connection for {address}: {e}')
-            print(f"Found remote agents: {self.list_remote_agents()}")
+                else:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+            except Exception as e:  # Catch other potential errors
+                print(f'ERROR: Failed to initialize connection for {address}: {e}')
+                return
+
+    def _register_card(self, address: str, card: AgentCard) -> None:
+        # Keep the existing connection unless the card changed
+        if self.cards.get(card.name) == card and card.name in self.remote_agent_connections:
+            return
+
+        remote_connection = RemoteAgentConnections(agent_card=card, agent_url=address)
+        self.remote_agent_connections[card.name] = remote_connection
+        self.cards[card.name] = card
 
     
     async def send_message(self, agent_name: str, task: str):
@@ -139,13 +406,43 @@ class RoutingAgent:
         return send_response.root.result
 
 
-    def create_agent(self):
+    async def stream_message(self, agent_name: str, task: str, on_event: RemoteEventCallback):
+        # Sends a task to a remote agent over A2A streaming, forwarding each event as it arrives
+
+        if agent_name not in self.remote_agent_connections:
+            raise ValueError(f'Agent {agent_name} not found')
+
+        client = self.remote_agent_connections[agent_name]
+        message_id = str(uuid.uuid4())
+
+        payload: dict[str, Any] = {
+            'message': {
+                'role': 'user',
+                'parts': [{'kind': 'text', 'text': task}],
+                'messageId': message_id,
+            },
+        }
+        message_request = SendStreamingMessageRequest(id=message_id, params=MessageSendParams.model_validate(payload))
+
+        # The last event carries the final task state, which becomes the tool output
+        final_event = None
+        async for response in client.send_message_streaming(message_request):
+            if not isinstance(response.root, SendStreamingMessageSuccessResponse):
+                raise ValueError(f'Remote agent {agent_name} returned an error: {response.root.error}')
+
+            final_event = response.root.result
+            await on_event(agent_name, final_event)
+
+        return final_event
+
+
+    async def create_agent(self):
         # Create an Azure AI Agent instance
         
         try:
             # Create Azure AI Agent with the send_message function
             functions = FunctionTool({self.send_message})
-            self.azure_agent = self.agents_client.create_agent(
+            self.azure_agent = await self.registry.get_or_create_agent(
                 model=os.environ["MODEL_DEPLOYMENT_NAME"],
                 name="routing-agent",
                 instructions=f"""
@@ -161,104 +458,164 @@ class RoutingAgent:
                 tools=functions.definitions
             )
 
-            # Create a thread for conversation
-            self.current_thread = self.agents_client.threads.create()
-
             return self.azure_agent
             
         except Exception as e:
             print(f"Error creating Azure AI agent: {e}")
             raise
 
-    async def process_user_message(self, user_message: str) -> str:
+    async def process_user_message(self, user_message: str, session_id: str) -> str:
 
         if not hasattr(self, 'azure_agent') or not self.azure_agent:
             return "Azure AI Agent not initialized. Please ensure the agent is properly created."
         
-        if not hasattr(self, 'current_thread') or not self.current_thread:
-            return "Azure AI Thread not initialized. Please ensure the agent is properly created."
-        
         try:
-            # Create message in the thread
-            self.agents_client.messages.create(
-                thread_id=self.current_thread.id, 
-                role=MessageRole.User, 
-                content=user_message
-            )
-
-            # Create and run the agent
-            run = self.agents_client.runs.create(
-                thread_id=self.current_thread.id, 
-                agent_id=self.azure_agent.id
-            )
-            
-            # Need to await send_message function
-            while run.status in ["queued", "in_progress", "requires_action"]:
-                time.sleep(1)
-                run = self.agents_client.runs.get(thread_id=self.current_thread.id, run_id=run.id)
-
-                if run.status == "requires_action":
-                    tool_calls = run.required_action.submit_tool_outputs.tool_calls
-                    tool_outputs = []
-                    
-                    for tool_call in tool_calls:
-                        function_name = tool_call.function.name
-                        function_args = json.loads(tool_call.function.arguments)
-                        
-                        if function_name == "send_message":
-                            try:
-                                result = await self.send_message(agent_name=function_args["agent_name"], task=function_args["task"])
-                                output = json.dumps(result.model_dump() if hasattr(result, 'model_dump') else str(result))
+            # Runs on the same session are serialized; different sessions run concurrently
+            async with self.threads.session(session_id) as thread_id:
+                return await self._run_on_thread(thread_id, user_message)
 
-                            except Exception as e:
-                                output = json.dumps({"error": str(e)})
-                        else:
-                            output = json.dumps({"error": f"Unknown function: {function_name}"})
-                        
-                        tool_outputs.append({"tool_call_id": tool_call.id,  "output": output})
-                
-                    # Submit the tool outputs
-                    self.agents_client.runs.submit_tool_outputs(
-                        thread_id=self.current_thread.id, run_id=run.id, tool_outputs=tool_outputs
-                    )
-
-            if run.status == "failed":
-                error_info = f"Run error: {run.last_error}"
-                print(error_info)
-                return f"Error processing request: {error_info}"
-
-            # Return the response
-            messages = self.agents_client.messages.list(thread_id=self.current_thread.id, order=ListSortOrder.DESCENDING)
-            for msg in messages:
-                if msg.role == MessageRole.AGENT and msg.text_messages:
-                    last_text = msg.text_messages[-1]
-                    return last_text.text.value
-            
-            return "No response received from agent."
-            
         except Exception as e:
             error_msg = f"Error in process_user_message: {e}"
             print(error_msg)
             return f"An error occurred while processing your message."
 
 
-async def _get_initialized_routing_agent_sync() -> RoutingAgent:
+    async def process_user_message_stream(self, user_message: str, session_id: str) -> AsyncIterator[dict[str, str]]:
+        # Yield server-sent events for the routing run and any remote agent tasks as they happen
+
+        if not hasattr(self, 'azure_agent') or not self.azure_agent:
+            yield {"event": "error", "data": json.dumps({"error": "Azure AI Agent not initialized."})}
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        handler = RoutingStreamHandler(self, queue)
+
+        async def run_stream():
+            try:
+                async with self.threads.session(session_id) as thread_id:
+                    await self.agents_client.messages.create(
+                        thread_id=thread_id,
+                        role=MessageRole.User,
+                        content=user_message
+                    )
+                    try:
+                        async with await self.agents_client.runs.stream(
+                            thread_id=thread_id, agent_id=self.azure_agent.id, event_handler=handler
+                        ) as stream:
+                            await stream.until_done()
+                    except asyncio.CancelledError:
+                        # The client went away; stop the run so the session thread can take the next message
+                        if handler.run and handler.run.status not in ("completed", "failed", "cancelled", "expired"):
+                            try:
+                                await self.agents_client.runs.cancel(thread_id=thread_id, run_id=handler.run.id)
+                            except Exception as e:
+                                print(f"Could not cancel run {handler.run.id}: {e}")
+                        raise
+
+            except Exception as e:
+                print(f"Error in process_user_message_stream: {e}")
+                await handler.publish("error", {"error": "An error occurred while processing your message."})
 
-    async def _async_main() -> RoutingAgent:
-        routing_agent_instance = await RoutingAgent.create(
-            remote_agent_addresses=[
-                f"http://{os.environ["SERVER_URL"]}:{os.environ["TITLE_AGENT_PORT"]}",
-                f"http://{os.environ["SERVER_URL"]}:{os.environ["OUTLINE_AGENT_PORT"]}",
-            ]
+            # Not sent when cancelled: nobody is reading, and a full queue would never take it
+            await queue.put(None)
+
+        producer = asyncio.create_task(run_stream())
+
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+
+            await producer
+            yield {"event": "done", "data": json.dumps({"session_id": session_id})}
+        finally:
+            # A disconnected client closes this generator before the run is done
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+    async def _run_on_thread(self, thread_id: str, user_message: str) -> str:
+        # Create message in the thread
+        await self.agents_client.messages.create(
+            thread_id=thread_id, 
+            role=MessageRole.User, 
+            content=user_message
+        )
+
+        # Create and run the agent
+        run = await self.agents_client.runs.create(
+            thread_id=thread_id, 
+            agent_id=self.azure_agent.id
         )
-        # Create the Azure AI agent
-        routing_agent_instance.create_agent()
-        return routing_agent_instance
 
-    try:
-        return asyncio.run(_async_main())
-    except RuntimeError as e:
-        raise
+        # Poll the run without blocking the event loop, backing off while it stays busy
+        poll_interval = RUN_POLL_INITIAL_INTERVAL
+        while run.status in ["queued", "in_progress", "requires_action"]:
+            await asyncio.sleep(poll_interval)
+            poll_interval = min(poll_interval * RUN_POLL_BACKOFF, RUN_POLL_MAX_INTERVAL)
+            run = await self.agents_client.runs.get(thread_id=thread_id, run_id=run.id)
+
+            if run.status == "requires_action":
+                tool_calls = run.required_action.submit_tool_outputs.tool_calls
+
+                # Dispatch independent tool calls concurrently so the batch takes as long as the slowest one
+                tool_outputs = await asyncio.gather(
+                    *(self._dispatch_tool_call(tool_call, thread_id) for tool_call in tool_calls)
+                )
+            
+                # Submit the tool outputs
+                run = await self.agents_client.runs.submit_tool_outputs(
+                    thread_id=thread_id, run_id=run.id, tool_outputs=tool_outputs
+                )
+
+                # The run resumes right after tool outputs are submitted, so poll tightly again
+                poll_interval = RUN_POLL_INITIAL_INTERVAL
+
+        if run.status == "failed":
+            error_info = f"Run error: {run.last_error}"
+            print(error_info)
+            return f"Error processing request: {error_info}"
+
+        # Return the response
+        messages = self.agents_client.messages.list(thread_id=thread_id, order=ListSortOrder.DESCENDING)
+        async for msg in messages:
+            if msg.role == MessageRole.AGENT and msg.text_messages:
+                last_text = msg.text_messages[-1]
+                return last_text.text.value
+        
+        return "No response received from agent."
+
+    async def _dispatch_tool_call(self, tool_call, thread_id: str, on_event: RemoteEventCallback | None = None) -> dict[str, str]:
+        # Run one tool call with its own timeout; errors are reported back to the run instead of raised
+        function_name = tool_call.function.name
+
+        if function_name == "send_message":
+            context_token = _routing_context_id.set(thread_id)
+            try:
+                function_args = json.loads(tool_call.function.arguments)
+                if on_event:
+                    remote_call = self.stream_message(function_args["agent_name"], function_args["task"], on_event)
+                else:
+                    remote_call = self.send_message(agent_name=function_args["agent_name"], task=function_args["task"])
+                result = await asyncio.wait_for(remote_call, timeout=TOOL_CALL_TIMEOUT)
+                output = json.dumps(result.model_dump() if hasattr(result, 'model_dump') else str(result))
+
+            except asyncio.TimeoutError:
+                output = json.dumps({"error": f"Remote agent did not respond within {TOOL_CALL_TIMEOUT} seconds"})
+            except Exception as e:
+                output = json.dumps({"error": str(e)})
+            finally:
+                _routing_context_id.reset(context_token)
+        else:
+            output = json.dumps({"error": f"Unknown function: {function_name}"})
+
+        return {"tool_call_id": tool_call.id, "output": output}
+
+    async def close(self) -> None:
+        # Stop card refreshes, delete session threads, then release the async client and credential sessions
+        for task in self._background_tasks:
+            task.cancel()
+        await self.threads.close()
+        await self.registry.close()
+        await self.agents_client.close()
+        await close_azure_credential()
 
-# Initialize the routing agent
-routing_agent = _get_initialized_routing_agent_sync()
@@ -0,0 +1,80 @@
+""" On-disk cache of remote agent cards with TTL and ETag revalidation """
+
+import json
+import os
+import tempfile
+import time
+import httpx
+
+from a2a.types import AgentCard
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+class AgentCardCache:
+    """Persists agent cards by address so the routing agent can start without waiting on remotes."""
+
+    def __init__(self, path: str, ttl: float = 300):
+        self.path = path
+        self.ttl = ttl
+        self._entries: dict[str, dict] = {}
+
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, address: str) -> AgentCard | None:
+        entry = self._entries.get(address)
+        if not entry:
+            return None
+        try:
+            return AgentCard.model_validate(entry['card'])
+        except Exception:
+            return None
+
+    def is_fresh(self, address: str) -> bool:
+        entry = self._entries.get(address)
+        return bool(entry) and time.time() - entry['fetched_at'] < self.ttl
+
+    async def resolve(self, client: httpx.AsyncClient, address: str) -> AgentCard:
+        # Fetch the card, sending the cached validators so an unchanged card costs a 304
+        entry = self._entries.get(address)
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = await client.get(address.rstrip('/') + AGENT_CARD_WELL_KNOWN_PATH, headers=headers)
+
+        if response.status_code == 304 and entry:
+            entry['fetched_at'] = time.time()
+            self._save()
+            return AgentCard.model_validate(entry['card'])
+
+        response.raise_for_status()
+        card = AgentCard.model_validate(response.json())
+        self._entries[address] = {
+            'card': card.model_dump(mode='json', exclude_none=True),
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'fetched_at': time.time(),
+        }
+        self._save()
+        return card
+
+    def _save(self) -> None:
+        # Write to a temporary file first so a crash never leaves a truncated cache. Each save gets its
+        # own temporary file, so routing workers sharing the cache never write into each other's.
+        directory, name = os.path.split(os.path.abspath(self.path))
+        temp_path = None
+        try:
+            with tempfile.NamedTemporaryFile('w', dir=directory, prefix=f'{name}.', suffix='.tmp',
+                                             delete=False) as f:
+                temp_path = f.name
+                json.dump(self._entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f'WARNING: Failed to save agent card cache: {e}')
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,44 @@
+""" Process-wide httpx connection pool shared by all A2A traffic from the routing agent """
+
+import os
+import httpx
+
+# Pool limits and timeouts for calls to remote agents
+A2A_HTTP_TIMEOUT = float(os.getenv("A2A_HTTP_TIMEOUT", "30"))
+A2A_HTTP_MAX_CONNECTIONS = int(os.getenv("A2A_HTTP_MAX_CONNECTIONS", "100"))
+A2A_HTTP_MAX_KEEPALIVE = int(os.getenv("A2A_HTTP_MAX_KEEPALIVE", "20"))
+A2A_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("A2A_HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+A2A_HTTP2 = os.getenv("A2A_HTTP2", "false").lower() in ("1", "true", "yes")
+
+_client: httpx.AsyncClient | None = None
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("WARNING: A2A_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+        return False
+
+def get_http_client() -> httpx.AsyncClient:
+    # Share one pool so every remote call reuses open connections instead of a new handshake
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=A2A_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=A2A_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=A2A_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=A2A_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            http2=A2A_HTTP2 and _http2_available(),
+        )
+    return _client
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,70 @@
+""" Circuit breaker and latency tracking for calls to remote agents """
+
+import time
+from collections import deque
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a remote agent whose circuit is open."""
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single probe through once the reset timeout passes."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        if self.state == 'closed':
+            return
+        if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = 'half_open'
+        if self.state == 'half_open' and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f'Remote agent is unavailable; retrying in {retry_in:.0f} seconds')
+
+    def record_success(self) -> None:
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.times_opened += 1
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'times_opened': self.times_opened,
+        }
+
+class LatencyWindow:
+    """Keeps the most recent call latencies to derive percentiles."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
@@ -1,9 +1,12 @@
 import os
+import uuid
 import asyncio
 from fastapi import FastAPI, Request
+from sse_starlette.sse import EventSourceResponse
 from dotenv import load_dotenv
 from contextlib import asynccontextmanager
 from routing_agent.agent import RoutingAgent  
+from routing_agent.http_pool import close_http_client
 
 load_dotenv()
 
@@ -17,9 +20,13 @@ async def lifespan(app: FastAPI):
         f"http://{os.environ["SERVER_URL"]}:{os.environ["TITLE_AGENT_PORT"]}",
         f"http://{os.environ["SERVER_URL"]}:{os.environ["OUTLINE_AGENT_PORT"]}",
     ])
-    routing_agent.create_agent()
+    await routing_agent.create_agent()
     print("Routing agent initialized.")
     yield
+    await routing_agent.close()
+
+    # Close pooled connections to the remote agents
+    await close_http_client()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -29,22 +36,40 @@ async def handle_message(request: Request):
 
     data = await request.json()
     user_message = data.get("message")
+    session_id = data.get("session_id") or str(uuid.uuid4())
 
     if not user_message:
         return {"error": "No message provided."}
     
     try:
-        response = await routing_agent.process_user_message(user_message)
+        response = await routing_agent.process_user_message(user_message, session_id)
 
     except Exception as e:
         return {"error": f"Failed to process message: {str(e)}"}
     
-    return {"response": response}
+    return {"response": response, "session_id": session_id}
+
+@app.post("/message/stream")
+async def handle_message_stream(request: Request):
+    data = await request.json()
+    user_message = data.get("message")
+    session_id = data.get("session_id") or str(uuid.uuid4())
+
+    if not user_message:
+        return {"error": "No message provided."}
+
+    # Relay routing run deltas and remote task events as server-sent events
+    return EventSourceResponse(routing_agent.process_user_message_stream(user_message, session_id))
 
 @app.get("/health")
 async def health_check():
     return {"status": "Routing agent is running!"}
 
+@app.get("/remote-agents/stats")
+async def remote_agent_stats():
+    # Circuit breaker state, latency percentiles and hedge wins for each remote agent
+    return routing_agent.remote_agent_stats()
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv["ROUTING_AGENT_PORT"])
@@ -1,5 +1,6 @@
 """ Runs each agent server and starts the client """
 
+import argparse
 import asyncio
 import subprocess
 import sys
@@ -17,23 +18,28 @@ servers = [
     {
         "name": "title_agent_server",
         "module": "title_agent.server:app",
-        "port": os.environ["TITLE_AGENT_PORT"]
+        "port": os.environ["TITLE_AGENT_PORT"],
+        "state": "A2A context threads and unflushed task writes"
     },
     {
         "name": "outline_agent_server",
         "module": "outline_agent.server:app",
-        "port": os.environ["OUTLINE_AGENT_PORT"]
+        "port": os.environ["OUTLINE_AGENT_PORT"],
+        "state": "A2A context threads and unflushed task writes"
     },
     {
         "name": "routing_agent_server",
         "module": "routing_agent.server:app",
-        "port": os.environ["ROUTING_AGENT_PORT"]
+        "port": os.environ["ROUTING_AGENT_PORT"],
+        "state": "session threads",
+        # The routing agent discovers the remote agents at startup
+        "depends_on": ["title_agent_server", "outline_agent_server"]
     },
 ]
 
 server_procs = []
 
-async def wait_for_server_ready(server, timeout=30):
+async def wait_for_server_ready(server, timeout=30, interval=0.1):
     async with httpx.AsyncClient() as client:
         start = time.time()
         while True:
@@ -48,7 +54,7 @@ async def wait_for_server_ready(server, timeout=30):
             if time.time() - start > timeout:
                 print(f"❌ Timeout waiting for server health at {health_url}")
                 return False
-            await asyncio.sleep(1)
+            await asyncio.sleep(interval)
 
 def stream_subprocess_output(process):
     while True:
@@ -58,63 +64,115 @@ def stream_subprocess_output(process):
         print(line.rstrip())
 
 
+def stop_servers():
+    print("🛑 Stopping server subprocess...")
+    # Terminate the server subprocess gracefully
+    for process in server_procs:
+        if process.poll() is None:  # Still running
+            if sys.platform == "win32":
+                process.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
 async def run_client_main():
     from client import main as client_main
     await client_main()
 
+async def start_server(server, workers, ready_events):
+    # Wait for the servers this one depends on, then start it and wait for its health check
+    for dependency in server.get("depends_on", []):
+        await ready_events[dependency].wait()
+
+    cmd = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        server["module"],
+        "--host",
+        server_url,
+        "--port",
+        str(server["port"]),
+        "--log-level",
+        "info"
+    ]
+    if workers > 1:
+        cmd += ["--workers", str(workers)]
+        # Each worker has its own copy of the server's in-memory state, and uvicorn hands each
+        # connection to whichever worker accepts it
+        print(f"⚠️ {server['name']} keeps its {server['state']} in memory, one copy per worker. "
+              f"A follow-up message or tasks/get call that reaches a different worker will not find them. "
+              f"Run more than one worker only behind a load balancer with sticky sessions.")
+    
+    print(f"🚀 Starting {server['name']} on port {server['port']} with {workers} worker(s)")
+    process = subprocess.Popen(
+        cmd,
+        env=os.environ.copy(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        universal_newlines=True,
+    )
+    server_procs.append(process)
+
+    thread = threading.Thread(target=stream_subprocess_output, args=(process,), daemon=True)
+    thread.start()
+
+    ready = await wait_for_server_ready(server)
+    if ready:
+        ready_events[server["name"]].set()
+    return ready
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the agent servers and run the client.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Uvicorn worker processes for every server. Every server keeps conversation state "
+                             "in memory per worker, so more than one worker needs sticky routing")
+    for server in servers:
+        agent = server["name"].split("_")[0]
+        parser.add_argument(f"--{agent}-workers", type=int, help=f"Worker processes for the {agent} agent server")
+    parser.add_argument("--no-client", action="store_true", help="Keep the servers running without the interactive client")
+    return parser.parse_args()
+
 async def main():
+    args = parse_args()
+
     print("🚀 Starting server subprocesses...")
-    for server in servers:
-        cmd = [
-            sys.executable,
-            "-m",
-            "uvicorn",
-            server["module"],
-            "--host",
-            server_url,
-            "--port",
-            str(server["port"]),
-            "--log-level",
-            "info"
-        ]
-        
-        print(f"🚀 Starting {server['name']} on port {server['port']}")
-        process = subprocess.Popen(
-            cmd,
-            env=os.environ.copy(),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            universal_newlines=True,
-        )
-        server_procs.append(process)
-
-        thread = threading.Thread(target=stream_subprocess_output, args=(process,), daemon=True)
-        thread.start()
-
-        ready = await wait_for_server_ready(server)
-        if not ready:
-            print(f"❌ Server '{server['name']}' failed to start, killing process...")
-            process.kill()
+    start = time.perf_counter()
+    ready_events = {server["name"]: asyncio.Event() for server in servers}
+
+    # Independent servers start together; dependents start as soon as their dependencies are healthy
+    starts = [
+        asyncio.create_task(start_server(
+            server,
+            getattr(args, f"{server['name'].split('_')[0]}_workers") or args.workers,
+            ready_events
+        ))
+        for server in servers
+    ]
+    for server, task in zip(servers, starts):
+        if not await task:
+            print(f"❌ Server '{server['name']}' failed to start, stopping servers...")
+            for other in starts:
+                other.cancel()
+            stop_servers()
             sys.exit(1)
 
+    print(f"✅ All servers ready in {time.perf_counter() - start:.2f}s")
+
     try:
-        await run_client_main()
+        if args.no_client:
+            # Serve until interrupted
+            await asyncio.Event().wait()
+        else:
+            await run_client_main()
     except Exception as e:
         print(f"❌ Client stopped: {e}")
     finally:
-        print("🛑 Stopping server subprocess...")
-        # Terminate the server subprocess gracefully
-        for process in server_procs:
-            if process.poll() is None:  # Still running
-                if sys.platform == "win32":
-                    process.send_signal(signal.CTRL_BREAK_EVENT)
-                else:
-                    process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
+        stop_servers()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,184 @@
+""" A2A task store backed by SQLite, used in place of InMemoryTaskStore """
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+from a2a.server.context import ServerCallContext
+from a2a.server.tasks import TaskStore
+from a2a.types import Task, TaskState
+
+# Tasks in these states never change again, so their history can be compacted
+TERMINAL_STATES = [
+    TaskState.completed.value,
+    TaskState.canceled.value,
+    TaskState.failed.value,
+    TaskState.rejected.value,
+]
+
+class SqliteTaskStore(TaskStore):
+    """Stores tasks in a WAL-mode SQLite database with batched writes and history compaction."""
+
+    def __init__(self, path: str, flush_interval: float = 0.05, max_batch: int = 500,
+                 compact_after: float = 3600, compact_interval: float = 300):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.compact_after = compact_after
+        self.compact_interval = compact_interval
+
+        # One connection, used from worker threads one call at a time
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                context_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                compacted INTEGER NOT NULL DEFAULT 0,
+                data TEXT NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_context_id ON tasks (context_id)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_state_updated ON tasks (state, updated_at)')
+        self._conn.commit()
+
+        # Saves are buffered here, with the time they were saved, until the writer commits them in one transaction
+        self._pending: dict[str, tuple[Task, float]] = {}
+        self._flushing: dict[str, tuple[Task, float]] = {}
+        # Only one batch is written at a time, so an older batch can never commit over a newer one
+        self._flush_lock = asyncio.Lock()
+        self._writer: asyncio.Task | None = None
+        self._last_compaction = time.monotonic()
+
+    async def save(self, task: Task, context: ServerCallContext | None = None) -> None:
+        self._pending[task.id] = (task, time.time())
+        self._ensure_writer()
+
+        # Apply back-pressure once a full batch is waiting
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+
+    async def get(self, task_id: str, context: ServerCallContext | None = None) -> Task | None:
+        # Serve unflushed saves first so callers always read their own writes
+        saved = self._pending.get(task_id) or self._flushing.get(task_id)
+        if saved:
+            return saved[0]
+
+        row = await asyncio.to_thread(self._fetch_one, 'SELECT data FROM tasks WHERE id = ?', (task_id,))
+        return Task.model_validate_json(row[0]) if row else None
+
+    async def delete(self, task_id: str, context: ServerCallContext | None = None) -> None:
+        # Wait for a batch in flight, which may hold this task, before deleting the row
+        async with self._flush_lock:
+            self._pending.pop(task_id, None)
+            await asyncio.to_thread(self._execute, 'DELETE FROM tasks WHERE id = ?', (task_id,))
+
+    async def list_by_context(self, context_id: str) -> list[Task]:
+        # Return every task in a conversation, oldest first
+        await self.flush()
+        rows = await asyncio.to_thread(
+            self._fetch_all, 'SELECT data FROM tasks WHERE context_id = ? ORDER BY updated_at', (context_id,)
+        )
+        return [Task.model_validate_json(row[0]) for row in rows]
+
+    async def flush(self) -> None:
+        # save()'s back-pressure and the write loop can both flush; the lock makes them take turns
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch = self._pending
+            self._pending = {}
+            self._flushing = batch
+            rows = [
+                (task.id, task.context_id, task.status.state.value, saved_at, task.model_dump_json(exclude_none=True))
+                for task, saved_at in batch.values()
+            ]
+            try:
+                await asyncio.to_thread(self._write_batch, rows)
+            except Exception:
+                # Keep the batch so the next flush retries it, unless a newer save replaced it
+                for task_id, saved in batch.items():
+                    self._pending.setdefault(task_id, saved)
+                raise
+            finally:
+                self._flushing = {}
+
+    async def compact(self) -> int:
+        # Drop the message history of finished tasks older than compact_after, keeping status and artifacts
+        cutoff = time.time() - self.compact_after
+        placeholders = ','.join('?' * len(TERMINAL_STATES))
+        rows = await asyncio.to_thread(
+            self._fetch_all,
+            f'SELECT id, data FROM tasks WHERE state IN ({placeholders}) AND updated_at < ? AND compacted = 0',
+            (*TERMINAL_STATES, cutoff),
+        )
+        compacted = []
+        for task_id, data in rows:
+            task = Task.model_validate_json(data)
+            task.history = None
+            compacted.append((task.model_dump_json(exclude_none=True), task_id, cutoff))
+        if compacted:
+            await asyncio.to_thread(self._compact_rows, compacted)
+        return len(compacted)
+
+    async def close(self) -> None:
+        if self._writer:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        await self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def _write_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_compaction > self.compact_interval:
+                    self._last_compaction = time.monotonic()
+                    await self.compact()
+            except Exception as e:
+                print(f'WARNING: Task store write failed: {e}')
+
+    def _write_batch(self, rows: list[tuple]) -> None:
+        with self._db_lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO tasks (id, context_id, state, updated_at, compacted, data)
+                VALUES (?, ?, ?, ?, 0, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    context_id = excluded.context_id,
+                    state = excluded.state,
+                    updated_at = excluded.updated_at,
+                    compacted = 0,
+                    data = excluded.data
+            """, rows)
+
+    def _compact_rows(self, rows: list[tuple]) -> None:
+        with self._db_lock, self._conn:
+            # Skip rows that were saved again since they were read
+            self._conn.executemany('UPDATE tasks SET data = ?, compacted = 1 WHERE id = ? AND updated_at < ?', rows)
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._db_lock, self._conn:
+            self._conn.execute(sql, params)
+
+    def _fetch_one(self, sql: str, params: tuple):
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _fetch_all(self, sql: str, params: tuple) -> list:
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
@@ -0,0 +1,120 @@
+""" Maps conversation keys to Azure AI Foundry threads with LRU and idle-TTL eviction """
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+class _ThreadEntry:
+
+    def __init__(self, created: asyncio.Task):
+        # Resolves to the thread once it has been created; every session for the key awaits the same creation
+        self.created = created
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        # Sessions holding or waiting for the thread; an entry in use is never evicted
+        self.users = 0
+
+    @property
+    def thread_id(self) -> str:
+        return self.created.result().id
+
+class ThreadCache:
+    """Keeps one Foundry thread per key, evicting idle or least recently used threads."""
+
+    def __init__(self, agents_client, max_size: int = 256, ttl: float = 1800):
+        # agents_client must be the async AgentsClient (azure.ai.agents.aio)
+        self.agents_client = agents_client
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, _ThreadEntry] = OrderedDict()
+        self._deletions: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @asynccontextmanager
+    async def session(self, key: str) -> AsyncIterator[str]:
+        # Yield the thread ID for a key; only one run at a time can use a thread
+        entry = await self._get_or_create(key)
+        try:
+            async with entry.lock:
+                yield entry.thread_id
+        finally:
+            entry.users -= 1
+            self._touch(key, entry)
+
+    async def _get_or_create(self, key: str) -> _ThreadEntry:
+        # There is no await between looking up the entry and marking it in use, so no lock is needed and it
+        # can't be evicted before its session takes the thread lock. A new key's entry is added before its
+        # thread exists: callers for the same key share one creation, and other keys never wait for it.
+        self._evict_expired()
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _ThreadEntry(asyncio.ensure_future(self.agents_client.threads.create()))
+            self._entries[key] = entry
+        entry.users += 1
+        self._touch(key, entry)
+        self._evict_overflow()
+
+        try:
+            # A caller that gives up doesn't cancel the creation the others are waiting for
+            await asyncio.shield(entry.created)
+        except BaseException:
+            entry.users -= 1
+            if entry.created.done() and not entry.created.cancelled() and entry.created.exception():
+                # A failed creation isn't cached, so the next session for the key tries again
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            raise
+        return entry
+
+    def _touch(self, key: str, entry: _ThreadEntry) -> None:
+        # last_used and the order of entries are always updated together, so the order stays
+        # least recently used first; an entry dropped by close() is not put back
+        if self._entries.get(key) is entry:
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(key)
+
+    def _evict_expired(self) -> None:
+        # Entries are kept in least recently used order, so expired ones are at the front
+        cutoff = time.monotonic() - self.ttl
+        for key, entry in list(self._entries.items()):
+            if entry.last_used > cutoff:
+                break
+            if not entry.users:
+                self._evict(key)
+
+    def _evict_overflow(self) -> None:
+        # Drop least recently used threads that are not in use
+        for key, entry in list(self._entries.items()):
+            if len(self._entries) <= self.max_size:
+                break
+            if not entry.users:
+                self._evict(key)
+
+    def _evict(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        task = asyncio.create_task(self._delete_thread(entry))
+        self._deletions.add(task)
+        task.add_done_callback(self._deletions.discard)
+
+    async def _delete_thread(self, entry: _ThreadEntry) -> None:
+        try:
+            thread = await entry.created
+        except Exception:
+            return  # No thread was created
+        try:
+            await self.agents_client.threads.delete(thread.id)
+        except Exception as e:
+            print(f"WARNING: Failed to delete thread {thread.id}: {e}")
+
+    async def close(self, delete_threads: bool = True) -> None:
+        # Optionally delete every cached thread, then wait for pending deletions
+        if delete_threads:
+            for key in list(self._entries):
+                self._evict(key)
+        if self._deletions:
+            await asyncio.gather(*self._deletions, return_exceptions=True)
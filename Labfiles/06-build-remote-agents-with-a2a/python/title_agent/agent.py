@@ -1,9 +1,9 @@
 """ Azure AI Foundry Agent that generates a title """
 
 import os
-from azure.ai.agents import AgentsClient
-from azure.identity import DefaultAzureCredential
+from azure.ai.agents.aio import AgentsClient
 from azure.ai.agents.models import Agent, ListSortOrder, MessageRole
+from azure_credential import get_azure_credential
 
 class TitleAgent:
 
@@ -23,15 +23,12 @@ class TitleAgent:
 
         return self.agent
         
-    async def run_conversation(self, user_message: str) -> list[str]:
+    async def run_conversation(self, user_message: str, thread_id: str) -> list[str]:
         # Add a message to the thread, process it, and retrieve the response
 
         if not self.agent:
             await self.create_agent()
 
-        # Create a thread for the chat session
-
-
         # Send user message
         
 
@@ -43,9 +40,9 @@ class TitleAgent:
             return [f'Error: {run.last_error}']
 
         # Get response messages
-        messages = self.client.messages.list(thread_id=thread.id, order=ListSortOrder.DESCENDING)
+        messages = self.client.messages.list(thread_id=thread_id, order=ListSortOrder.DESCENDING)
         responses = []
-        for msg in messages:
+        async for msg in messages:
             # Only get the latest assistant response
             if msg.role == MessageRole.AGENT and msg.text_messages:
                 for text_msg in msg.text_messages:
@@ -54,6 +51,9 @@ class TitleAgent:
 
         return responses if responses else ['No response received']
 
+    async def close(self) -> None:
+        await self.client.close()
+
 async def create_foundry_title_agent() -> TitleAgent:
     agent = TitleAgent()
     await agent.create_agent()
@@ -1,11 +1,16 @@
 """ Azure AI Foundry Agent that generates a title """
 
+import os
+
 from a2a.server.events.event_queue import EventQueue
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
 from a2a.server.tasks import TaskUpdater
 from a2a.utils import new_agent_text_message
 from a2a.types import AgentCard, Part, TaskState
+from azure_credential import close_azure_credential
+from response_cache import CachedConversationAgent, ResponseCache
+from thread_cache import ThreadCache
 from title_agent.agent import TitleAgent, create_foundry_title_agent
 
 class FoundryAgentExecutor(AgentExecutor):
@@ -13,11 +18,27 @@ class FoundryAgentExecutor(AgentExecutor):
     def __init__(self, card: AgentCard):
         self._card = card
         self._foundry_agent: TitleAgent | None = None
+        self._threads: ThreadCache | None = None
+        self._cached_agent: CachedConversationAgent | None = None
+
+        # Repeated topics are answered from memory instead of a new Foundry run
+        self._response_cache = ResponseCache(
+            max_size=int(os.getenv('RESPONSE_CACHE_SIZE', '1024')),
+            ttl=float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '600'))
+        )
 
-    async def _get_or_create_agent(self) -> TitleAgent:
+    async def _get_or_create_agent(self) -> CachedConversationAgent:
         if not self._foundry_agent:
             self._foundry_agent = await create_foundry_title_agent()
-        return self._foundry_agent
+
+            # Follow-up messages in the same A2A context reuse one Foundry thread
+            self._threads = ThreadCache(
+                self._foundry_agent.client,
+                max_size=int(os.getenv('CONTEXT_THREAD_CACHE_SIZE', '256')),
+                ttl=float(os.getenv('CONTEXT_THREAD_TTL_SECONDS', '1800'))
+            )
+            self._cached_agent = CachedConversationAgent(self._foundry_agent, self._response_cache)
+        return self._cached_agent
 
     async def _process_request(self, message_parts: list[Part], context_id: str, task_updater: TaskUpdater) -> None:
         # Process a user request through the Foundry agent
@@ -68,6 +89,16 @@ class FoundryAgentExecutor(AgentExecutor):
             message=new_agent_text_message('Task cancelled by user', context_id=context.context_id)
         )
 
+    def cache_stats(self) -> dict:
+        return self._response_cache.snapshot()
+
+    async def close(self) -> None:
+        # Delete cached threads, then release the Foundry client and the shared credential
+        if self._threads:
+            await self._threads.close()
+        if self._foundry_agent:
+            await self._foundry_agent.close()
+        await close_azure_credential()
+
 def create_foundry_agent_executor(card: AgentCard) -> FoundryAgentExecutor:
     return FoundryAgentExecutor(card)
-
@@ -0,0 +1,188 @@
+""" Reuses Foundry agents across runs instead of creating and deleting them every time.
+Used by labs 02, 03 and 03b (AgentRegistry) and lab 06 (AsyncAgentRegistry), which each carry
+a copy made by sync_agent_registry.py so the lab folders run on their own. """
+
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from azure.ai.agents import AgentsClient
+from azure.ai.agents.models import Agent, FilePurpose, FileInfo, ToolSet
+
+if TYPE_CHECKING:
+    from azure.ai.agents.aio import AgentsClient as AsyncAgentsClient
+
+# Metadata key that marks an agent as managed by the registry and records its definition
+DEFINITION_HASH_KEY = "definition_hash"
+# Metadata key that records which app created the agent; a registry only reuses and deletes its own agents
+OWNER_KEY = "registry_owner"
+
+# Agents created on other machines or from other folders are left alone unless this names a shared owner
+AGENT_REGISTRY_OWNER = os.getenv("AGENT_REGISTRY_OWNER")
+
+def registry_owner(script: str | Path) -> str:
+    # One owner per app folder on one machine, so two labs, two checkouts or two people sharing
+    # a project never delete each other's agents, even when the agents have the same name
+    if AGENT_REGISTRY_OWNER:
+        return AGENT_REGISTRY_OWNER
+    app = f"{socket.gethostname()}:{Path(script).resolve().parent}"
+    return hashlib.sha256(app.encode()).hexdigest()[:16]
+
+def _as_dict(value):
+    # SDK models serialize with as_dict(); lists and plain values pass through
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [_as_dict(item) for item in value]
+    return value.as_dict() if hasattr(value, "as_dict") else value
+
+def definition_hash(model: str, instructions: str, tools=None, tool_resources=None) -> str:
+    # Tool order is not meaningful (function tools come from a set), so tools are hashed sorted
+    definition = {
+        "model": model,
+        "instructions": instructions,
+        "tools": sorted(json.dumps(tool, sort_keys=True) for tool in _as_dict(tools) or []),
+        "tool_resources": _as_dict(tool_resources) or {},
+    }
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode()).hexdigest()[:32]
+
+def select_versions(agents: list[Agent], name: str, owner: str, digest: str) -> tuple[Agent | None, list[Agent]]:
+    # Of this owner's versions of the agent, the oldest with the current definition is kept and all the
+    # others are stale: older definitions, and duplicates made by runs that created the agent at the same time.
+    # Every run picks the same one to keep, so concurrent runs agree on which agent survives.
+    own = [a for a in agents if a.name == name and (a.metadata or {}).get(OWNER_KEY) == owner]
+    current = [a for a in own if a.metadata.get(DEFINITION_HASH_KEY) == digest]
+    keep = min(current, key=lambda a: (a.created_at, a.id)) if current else None
+    return keep, [a for a in own if a is not keep]
+
+def _with(agents: list[Agent], agent: Agent) -> list[Agent]:
+    # A newly created agent may not be listed yet
+    return agents if any(a.id == agent.id for a in agents) else agents + [agent]
+
+class AgentRegistry:
+    """Finds this app's agent with the same name and definition, creating one only when the definition changes."""
+
+    def __init__(self, agents_client: AgentsClient, owner: str):
+        self.agents_client = agents_client
+        self.owner = owner
+        self._agents: list[Agent] | None = None
+        self._cleanup_threads: list[threading.Thread] = []
+
+    def get_or_create_agent(self, *, model: str, name: str, instructions: str, tools=None,
+                            tool_resources=None, toolset: ToolSet | None = None, **kwargs) -> Agent:
+        if toolset is not None:
+            tools = toolset.definitions
+            tool_resources = toolset.resources
+        digest = definition_hash(model, instructions, tools, tool_resources)
+        agent, stale = select_versions(self._list_agents(), name, self.owner, digest)
+
+        if agent is None:
+            created = self.agents_client.create_agent(
+                model=model,
+                name=name,
+                instructions=instructions,
+                tools=tools,
+                tool_resources=tool_resources,
+                metadata={DEFINITION_HASH_KEY: digest, OWNER_KEY: self.owner},
+                **kwargs,
+            )
+            # List again in case another run created the same version meanwhile
+            self._agents = None
+            self._agents = _with(self._list_agents(), created)
+            agent, stale = select_versions(self._agents, name, self.owner, digest)
+
+        # Stale versions are deleted without holding up the caller
+        if stale:
+            self._collect(stale)
+        return agent
+
+    def get_or_upload_file(self, file_path: str | Path, purpose: FilePurpose = FilePurpose.AGENTS) -> FileInfo:
+        # Uploads are named by content hash, so an unchanged file is found instead of uploaded again
+        path = Path(file_path)
+        content = path.read_bytes()
+        filename = f"{path.stem}-{hashlib.sha256(content).hexdigest()[:12]}{path.suffix}"
+
+        for file in self.agents_client.files.list(purpose=purpose).data:
+            if file.filename == filename and file.status == "processed":
+                return file
+
+        with path.open("rb") as f:
+            return self.agents_client.files.upload_and_poll(file=f, purpose=purpose, filename=filename)
+
+    def wait(self) -> None:
+        # Let stale agent cleanup finish before the client is closed
+        for thread in self._cleanup_threads:
+            thread.join()
+        self._cleanup_threads.clear()
+
+    def _list_agents(self) -> list[Agent]:
+        if self._agents is None:
+            self._agents = list(self.agents_client.list_agents(limit=100))
+        return self._agents
+
+    def _collect(self, stale: list[Agent]) -> None:
+        self._agents = [a for a in self._agents if a not in stale]
+
+        def delete_stale():
+            for agent in stale:
+                try:
+                    self.agents_client.delete_agent(agent.id)
+                except Exception as e:
+                    print(f"Could not delete old version of {agent.name} ({agent.id}): {e}")
+
+        thread = threading.Thread(target=delete_stale, daemon=True)
+        thread.start()
+        self._cleanup_threads.append(thread)
+
+class AsyncAgentRegistry:
+    """AgentRegistry for the async AgentsClient (azure.ai.agents.aio)."""
+
+    def __init__(self, agents_client: "AsyncAgentsClient", owner: str):
+        self.agents_client = agents_client
+        self.owner = owner
+        self._cleanup_tasks: set[asyncio.Task] = set()
+
+    async def get_or_create_agent(self, *, model: str, name: str, instructions: str, tools=None,
+                                  tool_resources=None, **kwargs) -> Agent:
+        digest = definition_hash(model, instructions, tools, tool_resources)
+        agent, stale = select_versions(await self._list_agents(), name, self.owner, digest)
+
+        if agent is None:
+            created = await self.agents_client.create_agent(
+                model=model,
+                name=name,
+                instructions=instructions,
+                tools=tools,
+                tool_resources=tool_resources,
+                metadata={DEFINITION_HASH_KEY: digest, OWNER_KEY: self.owner},
+                **kwargs,
+            )
+            # List again in case another run created the same version meanwhile
+            agent, stale = select_versions(_with(await self._list_agents(), created), name, self.owner, digest)
+
+        # Stale versions are deleted in the background
+        if stale:
+            task = asyncio.create_task(self._delete_stale(stale))
+            self._cleanup_tasks.add(task)
+            task.add_done_callback(self._cleanup_tasks.discard)
+        return agent
+
+    async def _list_agents(self) -> list[Agent]:
+        return [agent async for agent in self.agents_client.list_agents(limit=100)]
+
+    async def _delete_stale(self, stale: list[Agent]) -> None:
+        for agent in stale:
+            try:
+                await self.agents_client.delete_agent(agent.id)
+            except Exception as e:
+                print(f"Could not delete old version of {agent.name} ({agent.id}): {e}")
+
+    async def close(self) -> None:
+        # Let pending cleanup finish before the client is closed
+        if self._cleanup_tasks:
+            await asyncio.gather(*self._cleanup_tasks, return_exceptions=True)
@@ -0,0 +1,49 @@
+""" Copies agent_registry.py into every lab that uses it, so each lab folder runs on its own.
+Edit agent_registry.py here, then run: python sync_agent_registry.py (or --check to verify the copies) """
+
+import argparse
+import sys
+from pathlib import Path
+
+common_dir = Path(__file__).parent
+labfiles_dir = common_dir.parent
+
+SOURCE = common_dir / "agent_registry.py"
+LAB_FOLDERS = [
+    "02-build-ai-agent/Python",
+    "03-ai-agent-functions/Python",
+    "03b-build-multi-agent-solution/Python",
+    "06-build-remote-agents-with-a2a/python",
+]
+
+HEADER = (
+    "# Vendored copy of Labfiles/common/agent_registry.py. Don't edit it here: change that file\n"
+    "# and run Labfiles/common/sync_agent_registry.py to update every lab.\n"
+)
+
+def vendored_text() -> str:
+    return HEADER + SOURCE.read_text()
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy agent_registry.py into the labs that use it.")
+    parser.add_argument("--check", action="store_true", help="Only report copies that are out of date")
+    args = parser.parse_args()
+
+    text = vendored_text()
+    stale = []
+    for folder in LAB_FOLDERS:
+        target = labfiles_dir / folder / "agent_registry.py"
+        if target.exists() and target.read_text() == text:
+            continue
+        stale.append(target)
+        if not args.check:
+            target.write_text(text)
+            print(f"Updated {target.relative_to(labfiles_dir)}")
+
+    if args.check and stale:
+        for target in stale:
+            print(f"Out of date: {target.relative_to(labfiles_dir)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()